@@ -0,0 +1,157 @@
+"""Requests per second, latency and memory of the api clients against a local fake dev.to server
+
+    python -m benchmarks.bench_client --requests 500 --latency 0.02 --workers 16
+
+The fake server (tests/fake_devto.py) runs in a subprocess so its work does not count against the client.
+Access patterns:
+
+    sequential    one call after another, a new connection each time (keep_alive=False)
+    keep-alive    one call after another over a pooled keep-alive connection
+    pooled        --workers threads sharing one client
+    concurrent    public_articles_by_id with --workers threads
+    async         AsyncPyDevTo with --workers calls in flight (needs aiohttp)
+    paginated     iter_public_articles, one page at a time and with prefetch=2
+
+Latency is per api call, including retries.  Memory is the peak traced by tracemalloc over a second run of
+the pattern, as that slows the calls down.
+"""
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import pydevto
+from pydevto.metrics import RequestObserver
+
+
+class Latencies(RequestObserver):
+    def __init__(self):
+        self.values = []
+
+    def after_request(self, event):
+        self.values.append(event.elapsed)
+
+
+def start_server(args):
+    command = [
+        sys.executable,
+        "-m",
+        "tests.fake_devto",
+        "--port=0",
+        "--articles=%d" % args.articles,
+        "--body-size=%d" % args.body_size,
+        "--latency=%s" % args.latency,
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    return process, process.stdout.readline().strip()
+
+
+def patterns(url, args):
+    ids = [id for id in range(args.articles, 0, -1) if id % 5][: args.requests]
+    per_page = max(1, args.articles // 20)
+
+    def sequential(observer):
+        api = pydevto.PyDevTo(base_url=url, keep_alive=False, observers=[observer])
+        for id in ids:
+            api.public_article(id)
+        return len(ids)
+
+    def keep_alive(observer):
+        with pydevto.PyDevTo(base_url=url, observers=[observer]) as api:
+            for id in ids:
+                api.public_article(id)
+        return len(ids)
+
+    def pooled(observer):
+        with pydevto.PyDevTo(base_url=url, pool_maxsize=args.workers, observers=[observer]) as api:
+            with ThreadPoolExecutor(max_workers=args.workers) as executor:
+                list(executor.map(api.public_article, ids))
+        return len(ids)
+
+    def concurrent(observer):
+        with pydevto.PyDevTo(base_url=url, pool_maxsize=args.workers, observers=[observer]) as api:
+            return sum(1 for _ in api.public_articles_by_id(ids, max_workers=args.workers))
+
+    def async_(observer):
+        async def run():
+            async with pydevto.AsyncPyDevTo(base_url=url, max_concurrency=args.workers, observers=[observer]) as api:
+                await asyncio.gather(*[api.public_article(id) for id in ids])
+
+        asyncio.run(run())
+        return len(ids)
+
+    def paginated(prefetch):
+        def fetch(observer):
+            with pydevto.PyDevTo(base_url=url, observers=[observer]) as api:
+                list(api.iter_public_articles(per_page=per_page, prefetch=prefetch))
+            return len(observer.values)
+
+        return fetch
+
+    result = [
+        ("sequential", sequential),
+        ("keep-alive", keep_alive),
+        ("pooled", pooled),
+        ("concurrent", concurrent),
+    ]
+    try:
+        import aiohttp  # noqa: F401
+
+        result.append(("async", async_))
+    except ImportError:
+        pass
+    result.append(("paginated", paginated(0)))
+    result.append(("paginated x2", paginated(2)))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300, help="calls per pattern")
+    parser.add_argument("--articles", type=int, default=1000)
+    parser.add_argument("--body-size", type=int, default=5000, help="characters of body_html per article")
+    parser.add_argument("--latency", type=float, default=0.01, help="seconds the server takes per request")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc runs")
+    args = parser.parse_args()
+
+    process, url = start_server(args)
+    try:
+        print(
+            "%d calls per pattern, %.0f ms server latency, %d workers"
+            % (args.requests, args.latency * 1000, args.workers)
+        )
+        print("%-14s %8s %10s %10s %10s %10s" % ("pattern", "calls", "calls/s", "p50 ms", "p99 ms", "peak KB"))
+        for name, run in patterns(url, args):
+            observer = Latencies()
+            start = time.perf_counter()
+            calls = run(observer)
+            elapsed = time.perf_counter() - start
+            latencies = sorted(observer.values)
+            peak = ""
+            if not args.no_memory:
+                tracemalloc.start()
+                run(Latencies())
+                peak = "%.0f" % (tracemalloc.get_traced_memory()[1] / 1024)
+                tracemalloc.stop()
+            print(
+                "%-14s %8d %10.1f %10.2f %10.2f %10s"
+                % (
+                    name,
+                    calls,
+                    calls / elapsed,
+                    latencies[len(latencies) // 2] * 1000,
+                    latencies[int(len(latencies) * 0.99)] * 1000,
+                    peak or "-",
+                )
+            )
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
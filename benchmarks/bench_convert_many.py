@@ -0,0 +1,46 @@
+"""Documents per second of html_to_markdown_many as the number of worker processes grows
+
+    python -m benchmarks.bench_convert_many --documents 2000
+"""
+import argparse
+import os
+import time
+
+from benchmarks.bench_parsers import article
+from pydevto.markdown_converter import html_to_markdown, html_to_markdown_many
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--sections", type=int, default=10, help="sections per document")
+    parser.add_argument("--chunksize", type=int, default=4)
+    parser.add_argument("--parser", default=None, help="parser backend")
+    args = parser.parse_args()
+
+    html = article(args.sections)
+    print("%d documents of %.1f KB, %d cpus" % (args.documents, len(html) / 1024, os.cpu_count()))
+    start = time.perf_counter()
+    for _ in range(args.documents):
+        html_to_markdown(html, args.parser)
+    serial = time.perf_counter() - start
+    print("%-10s %10s %10s %10s" % ("workers", "seconds", "docs/s", "speedup"))
+    print("%-10s %10.2f %10.1f %10.2f" % ("serial", serial, args.documents / serial, 1))
+
+    workers = 1
+    while workers <= os.cpu_count():
+        start = time.perf_counter()
+        results = html_to_markdown_many(
+            (html for _ in range(args.documents)), workers=workers, chunksize=args.chunksize, parser=args.parser
+        )
+        errors = sum(result.error is not None for result in results)
+        elapsed = time.perf_counter() - start
+        print(
+            "%-10d %10.2f %10.1f %10.2f%s"
+            % (workers, elapsed, args.documents / elapsed, serial / elapsed, " (%d errors)" % errors if errors else "")
+        )
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
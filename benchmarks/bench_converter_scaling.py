@@ -0,0 +1,70 @@
+"""Conversion time of html_to_markdown as documents grow, time per KB should stay flat
+
+Nested lists indent every level, so their output (and time) grows with depth squared; compare against out KB.
+
+    python -m benchmarks.bench_converter_scaling
+"""
+import argparse
+import time
+
+from pydevto.markdown_converter import html_to_markdown
+
+
+def flat(n):
+    return "".join(
+        "<p>Paragraph %s with <b>bold</b>, <i>italic</i> and a_snake_case word.</p>" % i for i in range(n)
+    )
+
+
+def table(n):
+    rows = "".join(
+        "<tr><td>cell %s</td><td><a href='https://example.com/%s'>link</a></td></tr>" % (i, i) for i in range(n)
+    )
+    return "<table>%s</table>" % rows
+
+
+def ordered_list(n):
+    return "<ol>%s</ol>" % "".join("<li>item %s</li>\n" % i for i in range(n))
+
+
+def nested_list(n):
+    depth = max(1, n // 20)
+    return "<ul><li>item" * depth + "</li></ul>" * depth
+
+
+def nested_divs(n):
+    return "<div>" * n + "text" + "</div>" * n
+
+
+SHAPES = {
+    "flat": flat,
+    "table": table,
+    "ordered_list": ordered_list,
+    "nested_list": nested_list,
+    "nested_divs": nested_divs,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base", type=int, default=500, help="size of the smallest document")
+    parser.add_argument("--steps", type=int, default=5, help="number of times the size is doubled")
+    args = parser.parse_args()
+
+    print("%-12s %8s %10s %10s %10s %10s" % ("shape", "n", "KB", "out KB", "seconds", "us/KB"))
+    for name, make in SHAPES.items():
+        for step in range(args.steps):
+            n = args.base * 2 ** step
+            html = make(n)
+            start = time.perf_counter()
+            markdown = html_to_markdown(html)
+            elapsed = time.perf_counter() - start
+            kb = len(html) / 1024
+            print(
+                "%-12s %8d %10.1f %10.1f %10.3f %10.1f"
+                % (name, n, kb, len(markdown) / 1024, elapsed, elapsed / kb * 1e6)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Throughput and memory of html_to_markdown over a generated corpus, checked against a stored baseline
+
+    python -m benchmarks.bench_corpus                      # compare with benchmarks/baselines/corpus.json
+    python -m benchmarks.bench_corpus --update-baseline    # store this run as the baseline
+    python -m benchmarks.bench_corpus --parser lxml-direct --threshold 0.15
+
+The corpus has one set of documents per shape that matters in production: long articles, deeply nested
+lists, huge ordered lists, embed heavy posts, text heavy posts full of underscores and typical small posts.
+It is generated from a fixed seed, so every run converts the same documents.
+
+Throughput is the best of --repeat passes.  Each pass is preceded by a reference pass that only parses the
+same documents with BeautifulSoup and html.parser, none of pydevto, and the baseline stores the throughput
+of each shape with its reference time.  Expected throughput is scaled by how much faster or slower the
+reference runs now, so a baseline stays usable across machines and under varying load.  The run fails
+(exit status 1) when a shape is more than --threshold slower than expected.  Timings on shared machines are
+noisy, keep the threshold well above the run to run variation there.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from pydevto.markdown_converter import HTML_PARSER, html_to_markdown
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "corpus.json")
+DEFAULT_THRESHOLD = 0.25
+SEED = 2019
+
+WORDS = (
+    "the a python markdown article server client request response cache thread process parser list item "
+    "token stream embed video tweet function class module package value result error retry"
+).split()
+SNAKE_WORDS = ["snake_case", "__init__", "_private", "max_retries", "html_to_markdown", "a_b_c_d", "__dunder__"]
+
+
+def sentence(rng, n=12, words=WORDS):
+    return " ".join(rng.choice(words) for _ in range(n))
+
+
+def long_article(rng):
+    parts = []
+    for section in range(300):
+        parts.append("<h2>%s</h2>" % sentence(rng, 5).title())
+        for _ in range(3):
+            parts.append(
+                "<p>%s <b>%s</b> <em>%s</em> <a href='https://example.com/%s'>%s</a> &amp; %s.</p>"
+                % (sentence(rng), sentence(rng, 3), sentence(rng, 2), section, sentence(rng, 2), sentence(rng))
+            )
+        parts.append("<pre><code>def %s():\n    return %r\n</code></pre>" % (rng.choice(WORDS), sentence(rng, 4)))
+        parts.append("<blockquote><p>%s</p></blockquote>" % sentence(rng))
+        parts.append("<img src='https://example.com/%s.png' alt='%s'>" % (section, sentence(rng, 2)))
+    return "".join(parts)
+
+
+def nested_lists(rng):
+    def items(depth):
+        parts = []
+        for _ in range(3):
+            item = sentence(rng, 6)
+            if depth < 6:
+                tag = rng.choice(["ul", "ol"])
+                item += "<%s>%s</%s>" % (tag, items(depth + 1), tag)
+            parts.append("<li>%s</li>" % item)
+        return "".join(parts)
+
+    return "<p>%s</p><ul>%s</ul>" % (sentence(rng), items(0))
+
+
+def huge_ordered_list(rng):
+    return "<ol>%s</ol>" % "".join(
+        "<li>%s <code>%s</code></li>\n" % (sentence(rng, 8), rng.choice(WORDS)) for _ in range(5000)
+    )
+
+
+def embed_heavy(rng):
+    embeds = [
+        lambda: "<iframe src='https://www.youtube.com/embed/%s'></iframe>" % rng.randrange(10 ** 8),
+        lambda: "<iframe src='https://codepen.io/user/embed/%s'></iframe>" % rng.randrange(10 ** 6),
+        lambda: "<iframe src='https://soundcloud.com/user/track-%s'></iframe>" % rng.randrange(10 ** 6),
+        lambda: "<iframe src='https://cdn.embedly.com/widgets/media.html?src=https%%3A%%2F%%2Fwww.youtube.com"
+        "%%2Fembed%%2F%s'></iframe>" % rng.randrange(10 ** 8),
+        lambda: "<iframe src='https://cdn.unfurl.dev/embed?url=https%%3A%%2F%%2Ftwitter.com%%2Fuser%%2Fstatus"
+        "%%2F%s'></iframe>" % rng.randrange(10 ** 12),
+        lambda: "<blockquote class='twitter-tweet'><p>%s</p>&mdash; User (@user) "
+        "<a href='https://twitter.com/user/status/%s'>January 1, 2019</a></blockquote>"
+        % (sentence(rng), rng.randrange(10 ** 12)),
+        lambda: "<iframe src='https://example.com/widget/%s'></iframe>" % rng.randrange(10 ** 6),
+    ]
+    parts = []
+    for _ in range(400):
+        parts.append("<p>%s</p>" % sentence(rng))
+        parts.append(rng.choice(embeds)())
+    return "".join(parts)
+
+
+def underscores(rng):
+    words = WORDS + SNAKE_WORDS * 3
+    return "".join(
+        "<p>%s <code>%s</code> %s</p>" % (sentence(rng, 40, words), rng.choice(SNAKE_WORDS), sentence(rng, 40, words))
+        for _ in range(800)
+    )
+
+
+def small_post(rng):
+    parts = ["<h1>%s</h1>" % sentence(rng, 6).title()]
+    for _ in range(rng.randrange(4, 12)):
+        parts.append(
+            "<p>%s <a href='https://dev.to/%s'>%s</a></p>" % (sentence(rng), rng.choice(WORDS), sentence(rng, 2))
+        )
+    parts.append("<ul>%s</ul>" % "".join("<li>%s</li>" % sentence(rng, 5) for _ in range(4)))
+    return "".join(parts)
+
+
+# shape -> (document generator, number of documents)
+SHAPES = {
+    "long_article": (long_article, 2),
+    "nested_lists": (nested_lists, 4),
+    "huge_ordered_list": (huge_ordered_list, 2),
+    "embed_heavy": (embed_heavy, 6),
+    "underscores": (underscores, 3),
+    "small_posts": (small_post, 300),
+}
+
+
+def corpus(shapes=None):
+    rng = random.Random(SEED)
+    return {
+        name: [make(rng) for _ in range(count)]
+        for name, (make, count) in SHAPES.items()
+        if shapes is None or name in shapes
+    }
+
+
+def reference(documents):
+    """Seconds BeautifulSoup with html.parser takes to parse documents
+
+    Conversion is timed relative to this, so the baseline carries over to other machines and loads.
+    """
+    start = time.perf_counter()
+    for html in documents:
+        BeautifulSoup(html, HTML_PARSER)
+    return time.perf_counter() - start
+
+
+def measure(documents, parser, repeat, memory=True):
+    """Throughput of converting documents, the fastest of repeat passes
+
+    Each pass is preceded by a reference pass over the same documents, so both see the same machine load;
+    the fastest reference time is returned with the result.
+    """
+    size = sum(len(html.encode("utf-8")) for html in documents)
+    best = reference_time = float("inf")
+    for _ in range(repeat):
+        reference_time = min(reference_time, reference(documents))
+        start = time.perf_counter()
+        for html in documents:
+            html_to_markdown(html, parser)
+        best = min(best, time.perf_counter() - start)
+    result = {
+        "documents": len(documents),
+        "bytes": size,
+        "docs_per_sec": len(documents) / best,
+        "mb_per_sec": size / best / 1024 / 1024,
+        "reference": reference_time,
+    }
+    if memory:
+        # peak over converting one document at a time, what a batch job holds at once
+        tracemalloc.start()
+        for html in documents:
+            html_to_markdown(html, parser)
+        result["peak_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+    return result
+
+
+def compare(results, baseline, threshold):
+    """List of (shape, expected mb_per_sec, measured) for the shapes slower than the baseline allows"""
+    regressions = []
+    for name, result in results.items():
+        stored = baseline.get(name)
+        if stored is None:
+            continue
+        expected = stored["mb_per_sec"] * stored["reference"] / result["reference"]
+        if result["mb_per_sec"] < expected * (1 - threshold):
+            regressions.append((name, expected, result["mb_per_sec"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--parser", default=HTML_PARSER, help="parser backend")
+    parser.add_argument("--repeat", type=int, default=5, help="passes per shape, the fastest counts")
+    parser.add_argument("--shape", action="append", help="only run this shape, can be repeated")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    args = parser.parse_args()
+
+    documents = corpus(args.shape)
+    print("parser %s" % args.parser)
+    print("%-18s %6s %10s %10s %10s %10s" % ("shape", "docs", "MB", "docs/s", "MB/s", "peak KB"))
+    results = {}
+    for name, htmls in documents.items():
+        result = results[name] = measure(htmls, args.parser, args.repeat, memory=not args.no_memory)
+        print(
+            "%-18s %6d %10.2f %10.1f %10.2f %10s"
+            % (
+                name,
+                result["documents"],
+                result["bytes"] / 1024 / 1024,
+                result["docs_per_sec"],
+                result["mb_per_sec"],
+                "%.0f" % result["peak_kb"] if "peak_kb" in result else "-",
+            )
+        )
+
+    stored = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+    if args.update_baseline:
+        stored.setdefault(args.parser, {}).update(
+            (name, {key: result[key] for key in ("docs_per_sec", "mb_per_sec", "reference")})
+            for name, result in results.items()
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print("baseline written to %s" % args.baseline)
+        return
+
+    if args.parser not in stored:
+        print("no baseline for %s in %s, run with --update-baseline to create one" % (args.parser, args.baseline))
+        return
+    regressions = compare(results, stored[args.parser], args.threshold)
+    for name, expected, measured in regressions:
+        print(
+            "REGRESSION %s: %.2f MB/s, expected at least %.2f MB/s (baseline %.2f MB/s scaled to this machine)"
+            % (name, measured, expected * (1 - args.threshold), expected)
+        )
+    if regressions:
+        sys.exit(1)
+    print("no shape is more than %.0f%% slower than the baseline" % (args.threshold * 100))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Cold import time of pydevto and of its entry points, measured with python -X importtime
+
+    python -m benchmarks.bench_import --repeat 7 --max-ms 20
+
+Each scenario runs in a fresh interpreter, the time reported is the median over the runs of the cumulative
+import time of the modules the scenario loads beyond a bare interpreter.  With --max-ms the run fails when
+`import pydevto` alone takes longer, so a heavy import creeping back into pydevto/__init__.py is caught.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+SCENARIOS = [
+    ("import pydevto", "import pydevto"),
+    ("PyDevTo", "import pydevto; pydevto.PyDevTo"),
+    ("AsyncPyDevTo", "import pydevto; pydevto.AsyncPyDevTo"),
+    ("html_to_markdown", "import pydevto; pydevto.html_to_markdown"),
+]
+
+HEAVY = ["requests", "bs4", "lxml", "aiohttp", "asyncio", "multiprocessing"]
+
+
+def import_time(code):
+    """Microseconds spent importing modules for code, and the heavy modules it loaded"""
+    script = "import sys; %s; print(' '.join(m for m in %r if m in sys.modules))" % (code, HEAVY)
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", script], capture_output=True, text=True)
+    process.check_returncode()
+    total = 0
+    for line in process.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package", nested imports are indented
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name[1:].startswith(" "):
+            total += int(cumulative)
+    return total, process.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None, help="fail when import pydevto takes longer")
+    args = parser.parse_args()
+
+    baseline = statistics.median(import_time("pass")[0] for _ in range(args.repeat))
+    print("%-20s %10s  %s" % ("scenario", "ms", "heavy modules loaded"))
+    results = {}
+    for name, code in SCENARIOS:
+        runs = [import_time(code) for _ in range(args.repeat)]
+        results[name] = (statistics.median(total for total, _ in runs) - baseline) / 1000
+        print("%-20s %10.1f  %s" % (name, results[name], " ".join(runs[0][1]) or "-"))
+
+    if args.max_ms is not None and results["import pydevto"] > args.max_ms:
+        print("import pydevto took %.1f ms, more than %.1f ms" % (results["import pydevto"], args.max_ms))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
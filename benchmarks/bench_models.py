@@ -0,0 +1,85 @@
+"""Memory used by plain dict results compared with pydevto.models objects
+
+    python -m benchmarks.bench_models -n 100000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from pydevto.models import Article
+
+
+def article_json(i, body_size):
+    paragraph = "<p>Article %s paragraph with <code>some_code()</code> and a <a href='#'>link</a>.</p>\n" % i
+    return json.dumps(
+        {
+            "type_of": "article",
+            "id": i,
+            "title": "Article number %s" % i,
+            "description": "A description of article %s" % i,
+            "cover_image": "https://res.cloudinary.com/practicaldev/image/fetch/%s.png" % i,
+            "readable_publish_date": "Oct 26",
+            "social_image": "https://res.cloudinary.com/practicaldev/image/fetch/social-%s.png" % i,
+            "tag_list": ["python", "devto", "tutorial"],
+            "tags": "python, devto, tutorial",
+            "slug": "article-number-%s-1a2b" % i,
+            "path": "/ben/article-number-%s-1a2b" % i,
+            "url": "https://dev.to/ben/article-number-%s-1a2b" % i,
+            "canonical_url": "https://dev.to/ben/article-number-%s-1a2b" % i,
+            "comments_count": i % 17,
+            "positive_reactions_count": i % 101,
+            "public_reactions_count": i % 101,
+            "collection_id": None,
+            "created_at": "2019-10-26T12:00:00Z",
+            "edited_at": None,
+            "crossposted_at": None,
+            "published_at": "2019-10-26T12:00:00Z",
+            "last_comment_at": "2019-10-27T12:00:00Z",
+            "published_timestamp": "2019-10-26T12:00:00Z",
+            "reading_time_minutes": 4,
+            "body_html": paragraph * (body_size // len(paragraph)),
+            "body_markdown": "Article %s paragraph with `some_code()`.\n\n" % i * (body_size // 45),
+            "user": {
+                "name": "Ben",
+                "username": "ben",
+                "twitter_username": "bendhalpern",
+                "github_username": "benhalpern",
+                "website_url": None,
+                "profile_image": "https://res.cloudinary.com/practicaldev/image/fetch/ben.png",
+                "profile_image_90": "https://res.cloudinary.com/practicaldev/image/fetch/ben-90.png",
+            },
+        }
+    )
+
+
+def measure(payloads, convert):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    results = [convert(json.loads(payload)) for payload in payloads]
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=20000, help="number of articles")
+    parser.add_argument("--body-size", type=int, default=4000, help="approximate size of body_html in bytes")
+    args = parser.parse_args()
+
+    payloads = [article_json(i, args.body_size) for i in range(args.n)]
+    for name, convert in [("dict", lambda data: data), ("Article", Article)]:
+        size, elapsed = measure(payloads, convert)
+        print(
+            "%-8s %8.1f MB  %6.0f bytes/article  %6.2fs"
+            % (name, size / 2 ** 20, size / args.n, elapsed)
+        )
+
+
+if __name__ == "__main__":
+    main()
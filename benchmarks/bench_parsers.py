@@ -0,0 +1,54 @@
+"""Throughput of html_to_markdown with each installed parser backend
+
+    python -m benchmarks.bench_parsers
+"""
+import argparse
+import time
+
+from pydevto.markdown_converter import available_parsers, html_to_markdown
+from pydevto.markdown_stream import html_to_markdown_stream
+
+
+def article(n):
+    parts = []
+    for i in range(n):
+        parts.append("<h2>Section %s</h2>" % i)
+        parts.append(
+            "<p>Some <b>bold</b>, <em>emphasis</em> and a <a href='https://example.com/%s' title='t'>link</a> "
+            "with a snake_case word &amp; an entity.</p>" % i
+        )
+        parts.append("<ul><li>first</li><li>second <code>code</code></li></ul>")
+        parts.append("<blockquote><p>A quote</p></blockquote>")
+        parts.append("<img src='https://example.com/%s.png' alt='image'>" % i)
+        if i % 10 == 0:
+            parts.append("<iframe src='https://www.youtube.com/embed/kmjiUVEMvI4'></iframe>")
+    return "".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, default=200, help="sections per document")
+    parser.add_argument("--repeat", type=int, default=20, help="documents converted per backend")
+    args = parser.parse_args()
+
+    html = article(args.sections)
+    mb = len(html) * args.repeat / 1024 / 1024
+    print("document: %.1f KB, %d conversions per backend" % (len(html) / 1024, args.repeat))
+    print("%-24s %10s %10s" % ("backend", "seconds", "MB/s"))
+    runs = [(name, lambda name=name: html_to_markdown(html, parser=name)) for name in available_parsers()]
+    runs += [
+        ("%s stream" % name, lambda name=name: "".join(html_to_markdown_stream(html, parser=name)))
+        for name in available_parsers()
+        if name != "lxml"
+    ]
+    for name, convert in runs:
+        convert()  # warm up
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            convert()
+        elapsed = time.perf_counter() - start
+        print("%-24s %10.3f %10.2f" % (name, elapsed, mb / elapsed))
+
+
+if __name__ == "__main__":
+    main()
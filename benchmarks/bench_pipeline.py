@@ -0,0 +1,64 @@
+"""Articles per second of fetching and converting serially versus public_articles_markdown
+
+    python -m benchmarks.bench_pipeline --articles 200 --latency 0.05
+"""
+import argparse
+import os
+import time
+
+import pydevto
+from benchmarks.bench_parsers import article
+from pydevto.pipeline import public_articles_markdown
+from tests.stub_server import StubServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=100)
+    parser.add_argument("--sections", type=int, default=10, help="sections per article")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds the server takes per request")
+    parser.add_argument("--fetch-workers", type=int, default=8)
+    parser.add_argument("--convert-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--parser", default=None, help="parser backend")
+    args = parser.parse_args()
+
+    html = article(args.sections)
+
+    def route(request):
+        time.sleep(args.latency)
+        return {"id": int(request["path"].rsplit("/", 1)[1]), "body_html": html}
+
+    with StubServer() as server:
+        for article_id in range(args.articles):
+            server.route("GET", "/articles/%s" % article_id, route)
+        api = pydevto.PyDevTo(base_url=server.url, pool_maxsize=args.fetch_workers)
+        print(
+            "%d articles of %.1f KB, %.0f ms latency, %d cpus"
+            % (args.articles, len(html) / 1024, args.latency * 1000, os.cpu_count())
+        )
+        print("%-10s %10s %10s %10s" % ("", "seconds", "articles/s", "speedup"))
+
+        start = time.perf_counter()
+        for article_id in range(args.articles):
+            pydevto.html_to_markdown(api.public_article(article_id)["body_html"], args.parser)
+        serial = time.perf_counter() - start
+        print("%-10s %10.2f %10.1f %10.2f" % ("serial", serial, args.articles / serial, 1))
+
+        start = time.perf_counter()
+        results = public_articles_markdown(
+            api,
+            range(args.articles),
+            fetch_workers=args.fetch_workers,
+            convert_workers=args.convert_workers,
+            parser=args.parser,
+        )
+        errors = sum(result.error is not None for result in results)
+        elapsed = time.perf_counter() - start
+        print(
+            "%-10s %10.2f %10.1f %10.2f%s"
+            % ("pipeline", elapsed, args.articles / elapsed, serial / elapsed, " (%d errors)" % errors if errors else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
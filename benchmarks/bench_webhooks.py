@@ -0,0 +1,104 @@
+"""Deliveries per second a WebhookReceiver sustains under a local event generator
+
+    python -m benchmarks.bench_webhooks --events 20000 --connections 50 --duplicates 0.1
+
+Each connection posts its share of the events one after another over a keep-alive connection, redelivering a
+fraction of them.  Refused deliveries (503) are retried after a short pause, so with a slow --callback-delay
+the run shows the backpressure kicking in instead of the queue growing.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from pydevto.webhooks import WebhookReceiver
+
+
+async def sender(port, events, duplicates, latencies, statuses):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for event_id, body in events:
+            deliveries = 2 if random.random() < duplicates else 1
+            for _ in range(deliveries):
+                while True:
+                    request = (
+                        "POST / HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                        "X-Event-Id: %s\r\nContent-Length: %s\r\n\r\n" % (event_id, len(body))
+                    ).encode() + body
+                    start = time.perf_counter()
+                    writer.write(request)
+                    head = await reader.readuntil(b"\r\n\r\n")
+                    length = int(head.split(b"Content-Length: ", 1)[1].split(b"\r\n", 1)[0])
+                    await reader.readexactly(length)
+                    latencies.append(time.perf_counter() - start)
+                    status = int(head.split(b" ", 2)[1])
+                    statuses[status] = statuses.get(status, 0) + 1
+                    if status != 503:
+                        break
+                    await asyncio.sleep(0.01)
+    finally:
+        writer.close()
+
+
+async def run(args):
+    delivered = [0]
+
+    async def callback(events):
+        if args.callback_delay:
+            await asyncio.sleep(args.callback_delay)
+        delivered[0] += len(events)
+
+    receiver = WebhookReceiver(
+        callback,
+        port=0,
+        batch_size=args.batch_size,
+        batch_timeout=args.batch_timeout,
+        max_pending=args.max_pending,
+        enqueue_timeout=0.1,
+    )
+    events = [
+        (event_id, json.dumps({"data": {"type": "article_created", "attributes": {"id": event_id}}}).encode())
+        for event_id in range(args.events)
+    ]
+    latencies = []
+    statuses = {}
+    async with receiver:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *[
+                sender(receiver.port, events[i :: args.connections], args.duplicates, latencies, statuses)
+                for i in range(args.connections)
+            ]
+        )
+        acknowledged = time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+    return receiver.stats(), latencies, statuses, acknowledged, elapsed, delivered[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--duplicates", type=float, default=0.1, help="fraction of events delivered twice")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--batch-timeout", type=float, default=0.05)
+    parser.add_argument("--max-pending", type=int, default=1000)
+    parser.add_argument("--callback-delay", type=float, default=0, help="seconds the callback takes per batch")
+    args = parser.parse_args()
+
+    stats, latencies, statuses, acknowledged, elapsed, delivered = asyncio.run(run(args))
+    latencies.sort()
+    print("%d events over %d connections, %.0f%% redelivered" % (args.events, args.connections, args.duplicates * 100))
+    print("deliveries/s      %10.0f" % (len(latencies) / acknowledged))
+    print("events/s          %10.0f  (all delivered to the callback)" % (delivered / elapsed))
+    print("latency p50       %10.2f ms" % (latencies[len(latencies) // 2] * 1000))
+    print("latency p99       %10.2f ms" % (latencies[int(len(latencies) * 0.99)] * 1000))
+    print("statuses          %10s" % " ".join("%s:%s" % item for item in sorted(statuses.items())))
+    print("batches           %10d  (%.1f events per batch)" % (stats["batches"], delivered / max(stats["batches"], 1)))
+    print("duplicates        %10d" % stats["duplicates"])
+    print("refused           %10d" % stats["refused"])
+
+
+if __name__ == "__main__":
+    main()
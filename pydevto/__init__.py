@@ -1,4 +1,49 @@
 __version__ = '0.1.0'
 
-from pydevto.pydevto import PyDevTo
-from pydevto.markdown_converter import html_to_markdown
+import importlib
+
+# public name -> module defining it.  Modules are imported on first access (PEP 562), so eg. html_to_markdown
+# does not load requests and PyDevTo does not load beautifulsoup.
+_exports = {
+    "PyDevTo": "pydevto.pydevto",
+    "PyDevToError": "pydevto.pydevto",
+    "AsyncPyDevTo": "pydevto.async_pydevto",
+    "MarkdownCache": "pydevto.cache",
+    "ResponseCache": "pydevto.cache",
+    "Article": "pydevto.models",
+    "Tag": "pydevto.models",
+    "User": "pydevto.models",
+    "Webhook": "pydevto.models",
+    "MetricsCollector": "pydevto.metrics",
+    "RequestObserver": "pydevto.metrics",
+    "RateLimiter": "pydevto.ratelimit",
+    "DirectoryPublisher": "pydevto.publisher",
+    "ArticleMirror": "pydevto.mirror",
+    "ConversionProfile": "pydevto.markdown_converter",
+    "html_to_markdown": "pydevto.markdown_converter",
+    "html_to_markdown_many": "pydevto.markdown_converter",
+    "html_to_markdown_stream": "pydevto.markdown_stream",
+    "public_articles_markdown": "pydevto.pipeline",
+    "WebhookReceiver": "pydevto.webhooks",
+}
+
+__all__ = sorted(_exports)
+
+
+def __getattr__(name):
+    module = _exports.get(name)
+    if module is None:
+        # submodules, eg. pydevto.markdown_converter, as the eager imports used to make available
+        try:
+            return importlib.import_module("%s.%s" % (__name__, name))
+        except ModuleNotFoundError as e:
+            if e.name != "%s.%s" % (__name__, name):
+                raise
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_exports))
@@ -0,0 +1,252 @@
+import asyncio
+import json as jsonlib
+import time
+from collections import deque
+from itertools import islice
+
+try:
+    import aiohttp
+except ImportError:  # optional dependency, checked when the session is created
+    aiohttp = None
+
+from pydevto.pydevto import (
+    API_URL,
+    DEFAULT_BACKOFF_FACTOR,
+    DEFAULT_BACKOFF_MAX,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_TIMEOUT,
+    BasePyDevTo,
+    BulkResult,
+    PyDevToError,
+)
+from pydevto.coalesce import AsyncSingleFlight, request_key
+from pydevto.metrics import RequestEvent
+from pydevto.ratelimit import IDEMPOTENT_METHODS, should_retry
+
+DEFAULT_MAX_CONCURRENCY = 100
+
+
+class AsyncPyDevTo(BasePyDevTo):
+    """asyncio version of PyDevTo, every endpoint is a coroutine
+
+    Requires the optional aiohttp dependency (pip install pydevto[async]).
+
+    >>> async with AsyncPyDevTo(api_key="MY_KEY") as api:
+    ...     articles = await api.articles()
+    ...     async for article in api.iter_articles(state="all"):
+    ...         pass
+    """
+
+    def __init__(
+        self,
+        api_key=None,
+        timeout=DEFAULT_TIMEOUT,
+        base_url=API_URL,
+        max_concurrency=DEFAULT_MAX_CONCURRENCY,
+        keep_alive=True,
+        headers=None,
+        session=None,
+        rate_limiter=None,
+        max_retries=DEFAULT_MAX_RETRIES,
+        backoff_factor=DEFAULT_BACKOFF_FACTOR,
+        backoff_max=DEFAULT_BACKOFF_MAX,
+        models=False,
+        observers=None,
+        coalesce=False,
+    ):
+        """
+
+        :param api_key:  Your dev.to api key (https://dev.to/settings/account)
+        :param timeout: Timeout period for http requests, used for every endpoint
+        :param base_url: Root url of the api, eg. to point the client at a local server
+        :param max_concurrency: Maximum number of requests in flight at the same time, further calls wait
+        :param keep_alive: False to close the connection after every request
+        :param headers: Extra headers sent with every request
+        :param session: (optional) aiohttp.ClientSession to use instead of creating one.  The api key and
+            headers are sent with each request instead of being set on it, and close() leaves it open
+        :param rate_limiter: (optional) pydevto.ratelimit.RateLimiter every request waits on
+        :param max_retries: Number of times to retry a request rejected with 429, or failed with a 5xx or
+            connection error when the method is idempotent
+        :param backoff_factor: Base delay in seconds of the jittered exponential backoff between retries
+        :param backoff_max: Maximum backoff delay in seconds
+        :param models: True to return pydevto.models objects (Article, User, Tag, Webhook) instead of dicts
+        :param observers: pydevto.metrics.RequestObserver instances called before and after every request
+        :param coalesce: True to share the response of a GET among concurrent identical calls, see
+            pydevto.coalesce
+        """
+        super().__init__(
+            api_key=api_key,
+            timeout=timeout,
+            base_url=base_url,
+            headers=headers,
+            rate_limiter=rate_limiter,
+            max_retries=max_retries,
+            backoff_factor=backoff_factor,
+            backoff_max=backoff_max,
+            models=models,
+            observers=observers,
+        )
+        self.max_concurrency = max_concurrency
+        self.keep_alive = keep_alive
+        self._session = session
+        self._owns_session = session is None
+        self._semaphore = None
+        self.coalescer = AsyncSingleFlight() if coalesce else None
+
+    @property
+    def session(self):
+        """The pooled aiohttp.ClientSession shared by all calls on this client, created on first use
+
+        Must be accessed from within a running event loop.
+        """
+        if self._session is None:
+            self._session = self._create_session()
+        return self._session
+
+    def _create_session(self):
+        if aiohttp is None:
+            raise ImportError(
+                "AsyncPyDevTo requires aiohttp, install it with: pip install pydevto[async]"
+            )
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            force_close=not self.keep_alive,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers=self.default_headers(),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+
+    async def close(self):
+        """Close the session and release all pooled connections, a session passed in is left to its owner"""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _request(self, method, path, params=None, json=None, model=None):
+        if self.coalescer is not None and method == "GET":
+            key = request_key(method, self.base_url + path, params, self.api_key)
+            return await self.coalescer.do(key, lambda: self._observed_request(method, path, params, json, model))
+        return await self._observed_request(method, path, params, json, model)
+
+    async def _observed_request(self, method, path, params, json, model):
+        event = RequestEvent(method, path)
+        self._notify("before_request", event)
+        try:
+            return await self._call(method, path, params, json, model, event)
+        except Exception as e:
+            event.error = e
+            raise
+        finally:
+            event.finish()
+            self._notify("after_request", event)
+
+    async def _call(self, method, path, params, json, model, event):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if params:
+            # aiohttp does not drop None values like requests does
+            params = {k: v for k, v in params.items() if v is not None}
+        url = self.base_url + path
+        data = headers = None
+        if json is not None:
+            data = jsonlib.dumps(json).encode("utf-8")
+            headers = {"Content-Type": "application/json"}
+            event.bytes_sent = len(data)
+        if not self._owns_session:
+            # a session passed in does not carry the api key and default headers, see _create_session
+            headers = {**self.default_headers(), **(headers or {})}
+        # outside the try below, whose except clause needs aiohttp when the session can't be created without it
+        session = self.session
+        # the timeout of _create_session, set per request so it also applies to a session passed in
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        attempt = 0
+        while True:
+            event.retries = attempt
+            if self.rate_limiter is not None:
+                await asyncio.sleep(self.rate_limiter.reserve(method))
+            try:
+                # Wait for a slot before entering aiohttp, so queued calls don't eat into the request timeout
+                async with self._semaphore:
+                    async with session.request(
+                        method, url, params=params, data=data, headers=headers, timeout=timeout
+                    ) as response:
+                        event.status_code = response.status
+                        if attempt < self.max_retries and should_retry(method, response.status):
+                            delay = self._retry_delay(method, attempt, response.headers)
+                        else:
+                            raw = await response.read()
+                            event.bytes_received = len(raw)
+                            if response.status >= 400:
+                                try:
+                                    body = jsonlib.loads(raw)
+                                except ValueError:
+                                    body = raw.decode("utf-8", "replace")
+                                raise PyDevToError(response.status, body, url=url)
+                            started = time.perf_counter()
+                            result = jsonlib.loads(raw)
+                            event.decode_time = time.perf_counter() - started
+                            return self._to_model(result, model)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if method not in IDEMPOTENT_METHODS or attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(method, attempt)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _iter_pages(self, fetch, per_page, prefetch):
+        pending = deque()
+        page = 1
+        try:
+            while True:
+                while len(pending) <= prefetch:
+                    pending.append(asyncio.ensure_future(fetch(page)))
+                    page += 1
+                items = await pending.popleft()
+                if not items:
+                    return
+                for item in items:
+                    yield item
+                if per_page and len(items) < per_page:
+                    return
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _map_concurrent(self, fn, ids, max_workers, ordered):
+        max_workers = max_workers or self.max_concurrency
+        ids = iter(ids)
+        window = max_workers * 2
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def call(id):
+            async with semaphore:
+                return await fn(id)
+
+        # task -> id, in submission order
+        pending = {}
+        try:
+            while True:
+                for id in islice(ids, window - len(pending)):
+                    pending[asyncio.ensure_future(call(id))] = id
+                if not pending:
+                    return
+                if ordered:
+                    done = [next(iter(pending))]
+                    await asyncio.wait(done)
+                else:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    id = pending.pop(task)
+                    error = task.exception()
+                    yield BulkResult(id, None if error else task.result(), error)
+        finally:
+            for task in pending:
+                task.cancel()
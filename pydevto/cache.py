@@ -0,0 +1,296 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAXSIZE = 1024
+DEFAULT_TTL = 60
+
+
+class CacheEntry:
+    __slots__ = ("data", "etag", "last_modified", "stored_at")
+
+    def __init__(self, data, etag=None, last_modified=None, stored_at=None):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = time.time() if stored_at is None else stored_at
+
+    def validators(self):
+        """Headers to revalidate this entry with a conditional request"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class MemoryCache:
+    """Thread safe in-memory LRU mapping of key -> CacheEntry"""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskCache:
+    """Thread safe sqlite backed mapping of key -> CacheEntry that survives process restarts
+
+    Entry data is stored as json.
+    """
+
+    def __init__(self, path, table="entries"):
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS %s (key TEXT PRIMARY KEY, data TEXT, etag TEXT, "
+                "last_modified TEXT, stored_at REAL)" % table
+            )
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data, etag, last_modified, stored_at FROM %s WHERE key = ?" % self.table, (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(json.loads(row[0]), row[1], row[2], row[3])
+
+    def set(self, key, entry):
+        data = json.dumps(entry.data)
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO %s VALUES (?, ?, ?, ?, ?)" % self.table,
+                (key, data, entry.etag, entry.last_modified, entry.stored_at),
+            )
+
+    def delete(self, key):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM %s WHERE key = ?" % self.table, (key,))
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM %s" % self.table)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM %s" % self.table).fetchone()[0]
+
+
+class ResponseCache:
+    """Cache of GET responses for PyDevTo
+
+    Responses are served from the cache without contacting the server for `ttl` seconds.  After that a stale
+    entry is revalidated with If-None-Match / If-Modified-Since, so an unchanged resource costs a 304 response
+    instead of a full download and json decode.  Stale entries the server gave no validators for are evicted.
+
+    Cached objects are shared between callers and must not be modified.
+
+    >>> api = PyDevTo(cache=ResponseCache(maxsize=512, ttl=300, path="devto-cache.sqlite"))
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL, path=None):
+        """
+
+        :param maxsize: maximum number of responses kept in memory, least recently used ones are evicted first
+        :param ttl: seconds a response is used without revalidation
+        :param path: (optional) sqlite file to also store responses in, so they survive process restarts
+        """
+        self.ttl = ttl
+        self.memory = MemoryCache(maxsize)
+        self.disk = DiskCache(path) if path else None
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(method, url, params, api_key):
+        params = sorted((k, str(v)) for k, v in (params or {}).items() if v is not None)
+        raw = json.dumps([method, url, params, api_key])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def lookup(self, key):
+        """Return (entry, fresh) for key, entry is None when nothing usable is cached"""
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self.memory.set(key, entry)
+        if entry is not None and time.time() - entry.stored_at < self.ttl:
+            self._count("hits")
+            return entry, True
+        self._count("misses")
+        if entry is None or entry.etag or entry.last_modified:
+            return entry, False
+        self.delete(key)
+        return None, False
+
+    def store(self, key, data, etag=None, last_modified=None):
+        entry = CacheEntry(data, etag, last_modified)
+        self.memory.set(key, entry)
+        if self.disk is not None:
+            self.disk.set(key, entry)
+
+    def revalidated(self, key, entry):
+        """Mark a stale entry as fresh again after the server answered 304 Not Modified"""
+        self._count("revalidations")
+        entry.stored_at = time.time()
+        self.memory.set(key, entry)
+        if self.disk is not None:
+            self.disk.set(key, entry)
+
+    def delete(self, key):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+
+    def stats(self):
+        """Counters to size the cache with
+
+        Misses count every lookup that needed a request, revalidations the subset of those answered with 304.
+
+        :return: dict with hits, misses, revalidations, evictions and the number of entries in memory
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.memory.evictions,
+            "size": len(self.memory),
+        }
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+class MarkdownCache:
+    """Memoizes html_to_markdown, keyed by a hash of the html and of the converter that converts it
+
+    The key covers the converter class, its `version`, its options and embed providers, so changing any of them
+    (or upgrading to a converter that produces different markdown) never serves stale results, old entries simply
+    stop being used.
+    With a path, results are also stored in sqlite and shared between runs.
+
+    >>> cache = MarkdownCache(maxsize=4096, path="markdown-cache.sqlite")
+    >>> html_to_markdown(html, cache=cache)
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, path=None):
+        """
+
+        :param maxsize: maximum number of results kept in memory, least recently used ones are evicted first
+        :param path: (optional) sqlite file to also store results in, so they survive process restarts
+        """
+        self.memory = MemoryCache(maxsize)
+        self.disk = DiskCache(path, table="markdown") if path else None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(html, converter):
+        cls = type(converter)
+        raw = json.dumps(
+            [
+                "%s.%s" % (cls.__module__, cls.__qualname__),
+                converter.version,
+                converter.parser,
+                dict(converter.options, embeds=converter.embeds.key()),
+            ],
+            sort_keys=True,
+            default=repr,
+        )
+        digest = hashlib.sha256(raw.encode())
+        digest.update(html.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return the cached markdown for key, or None"""
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self.memory.set(key, entry)
+        self._count("misses" if entry is None else "hits")
+        return None if entry is None else entry.data
+
+    def set(self, key, markdown):
+        entry = CacheEntry(markdown)
+        self.memory.set(key, entry)
+        if self.disk is not None:
+            self.disk.set(key, entry)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+
+    def stats(self):
+        """
+        :return: dict with hits, misses, hit_rate, evictions and the number of entries in memory
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.memory.evictions,
+            "size": len(self.memory),
+        }
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
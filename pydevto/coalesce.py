@@ -0,0 +1,90 @@
+import threading
+
+
+def request_key(method, url, params, api_key):
+    """Identifies a request, calls with equal keys get the same response"""
+    return method, url, tuple(sorted((k, str(v)) for k, v in (params or {}).items() if v is not None)), api_key
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls: while fn runs for a key, other threads calling do() with the same
+    key wait for it and share its result (or exception) instead of running fn themselves
+
+    Callers share the same result object, so do not mutate it.
+
+    >>> flight = SingleFlight()
+    >>> flight.do(("GET", url), lambda: fetch(url))
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._executed = 0
+        self._coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self._executed += 1
+                leader = True
+            else:
+                self._coalesced += 1
+                leader = False
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        """Number of calls that ran (executed), that shared the result of another (coalesced) and in flight"""
+        with self._lock:
+            return {"executed": self._executed, "coalesced": self._coalesced, "in_flight": len(self._calls)}
+
+
+class AsyncSingleFlight(SingleFlight):
+    """SingleFlight for tasks on an event loop, do() takes a coroutine function and is awaited
+
+    The call runs in a task of its own, so a caller that is cancelled, including the one that started the call,
+    does not cancel it for the others.
+    """
+
+    async def do(self, key, fn):
+        # imported here so the sync client does not load asyncio, it is already loaded when this runs
+        import asyncio
+
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda task: self._done(key, task))
+            self._executed += 1
+        else:
+            self._coalesced += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key, task):
+        del self._calls[key]
+        if not task.cancelled():
+            # mark the exception as retrieved, every caller may have been cancelled
+            task.exception()
@@ -0,0 +1,174 @@
+import threading
+import urllib.parse as urlparse
+from functools import lru_cache
+
+DEFAULT_MEMO_SIZE = 4096
+
+
+def remove_scheme(url):
+    return (
+        url.replace("https://www.", "//")
+        .replace("https://", "//")
+        .replace("http://www.", "//")
+        .replace("http://", "//")
+    )
+
+
+def liquid_tag(name):
+    """Provider embedding the url as is, eg. liquid_tag("gist") gives {% gist https://gist.github.com/... %}"""
+
+    def provider(url, parts):
+        return "\n{% " + name + " " + url + " %}\n"
+
+    provider.__name__ = provider.__qualname__ = "liquid_tag_%s" % name
+    return provider
+
+
+def twitter(url, parts):
+    return "\n{% twitter " + parts.path.split("/")[-1] + " %}\n"
+
+
+def youtube(url, parts):
+    if parts.path.startswith("/embed/"):
+        return "\n{% youtube " + parts.path.replace("/embed/", "") + " %}\n"
+    v = urlparse.parse_qs(parts.query)["v"][0]
+    return "\n{% youtube " + v + " %}\n"
+
+
+def instagram(url, parts):
+    return "\n{% instagram " + parts.path.replace("/p", "").replace("/", "") + " %}\n"
+
+
+def replit(url, parts):
+    return "\n{% replit " + parts.path[1:] + " %}\n"
+
+
+# host -> provider, a provider is called with the original url and urlsplit() of the url without its scheme
+PROVIDERS = {
+    "twitter.com": twitter,
+    "youtube.com": youtube,
+    "codepen.io": liquid_tag("codepen"),
+    "soundcloud.com": liquid_tag("soundcloud"),
+    "github.com": liquid_tag("github"),
+    "instagram.com": instagram,
+    "repl.it": replit,
+}
+
+# iframe src prefix -> query parameter holding the url of the embedded content
+WRAPPERS = {
+    "cdn.unfurl.dev/embed?": "url",
+    "cdn.embedly.com": "src",
+}
+
+
+class PrefixIndex:
+    """Maps string prefixes to values, match() finds the value of the longest prefix of a string
+
+    Prefixes are grouped by length, so a match costs one dict lookup per distinct prefix length instead of a
+    startswith() per prefix.
+    """
+
+    def __init__(self):
+        self._by_length = {}
+        # (length, {prefix: value}), longest first
+        self._tables = []
+
+    def add(self, prefix, value):
+        self._by_length.setdefault(len(prefix), {})[prefix] = value
+        self._tables = sorted(self._by_length.items(), reverse=True)
+
+    def match(self, text):
+        for length, table in self._tables:
+            value = table.get(text[:length])
+            if value is not None:
+                return value
+        return None
+
+    def items(self):
+        for length in sorted(self._by_length):
+            for item in sorted(self._by_length[length].items()):
+                yield item
+
+
+class EmbedResolver:
+    """Turns embed urls into dev.to liquid tags, looking up the provider by host
+
+    A url is matched against the registered hosts once its scheme (and a www. following it) is removed, so
+    "twitter.com" matches https://twitter.com/..., http://www.twitter.com/... and //twitter.com/....  Results
+    are memoized per url.  Urls without a provider are embedded as a plain link.
+
+    >>> embeds = EmbedResolver()
+    >>> embeds.register("gist.github.com", tag="gist")
+    >>> embeds.resolve("https://gist.github.com/user/1234")
+    '\\n{% gist https://gist.github.com/user/1234 %}\\n'
+    """
+
+    def __init__(self, providers=None, wrappers=None, memo_size=DEFAULT_MEMO_SIZE):
+        """
+
+        :param providers: dict of host -> provider, defaults to PROVIDERS
+        :param wrappers: dict of iframe src prefix -> query parameter with the embedded url, defaults to WRAPPERS
+        :param memo_size: number of resolved urls to remember
+        """
+        self._providers = PrefixIndex()
+        self._wrappers = PrefixIndex()
+        self.resolve = lru_cache(maxsize=memo_size)(self._resolve)
+        self.unwrap = lru_cache(maxsize=memo_size)(self._unwrap)
+        for host, provider in (PROVIDERS if providers is None else providers).items():
+            self.register(host, provider)
+        for prefix, param in (WRAPPERS if wrappers is None else wrappers).items():
+            self.register_wrapper(prefix, param)
+
+    def register(self, host, provider=None, tag=None):
+        """Add or replace the provider for a host
+
+        :param host: host, without scheme, eg. "gist.github.com"
+        :param provider: function(url, parts) returning the markdown for a url, where parts is urlsplit() of the
+            url without its scheme
+        :param tag: instead of a provider, the name of a liquid tag that takes the url, eg. "gist"
+        """
+        if (provider is None) == (tag is None):
+            raise ValueError("Pass either a provider or a tag")
+        self._providers.add("//" + host, provider or liquid_tag(tag))
+        self.resolve.cache_clear()
+
+    def register_wrapper(self, prefix, param):
+        """Unwrap iframes whose src (without scheme) starts with prefix and embed the url in query parameter param"""
+        self._wrappers.add("//" + prefix, param)
+        self.unwrap.cache_clear()
+
+    def key(self):
+        """Identifies the registered providers, part of the MarkdownCache key"""
+        providers = [(host, "%s.%s" % (fn.__module__, fn.__qualname__)) for host, fn in self._providers.items()]
+        return [providers, list(self._wrappers.items())]
+
+    def _resolve(self, url):
+        normalized = remove_scheme(url)
+        provider = self._providers.match(normalized)
+        if provider is None:
+            return "\n" + url + "\n"
+        return provider(url, urlparse.urlsplit(normalized))
+
+    def _unwrap(self, src):
+        # the url embedded by an iframe, which is its src unless that is an embed service like unfurl or embedly
+        normalized = remove_scheme(src)
+        param = self._wrappers.match(normalized)
+        if param is not None:
+            params = urlparse.parse_qs(urlparse.urlsplit(urlparse.unquote(normalized)).query)
+            if params.get(param):
+                return params.get(param)[0]
+        return src
+
+
+_default_resolver = None
+_default_resolver_lock = threading.Lock()
+
+
+def default_resolver():
+    """The resolver used by converters that are not given one, register providers here to use them everywhere"""
+    global _default_resolver
+    if _default_resolver is None:
+        with _default_resolver_lock:
+            if _default_resolver is None:
+                _default_resolver = EmbedResolver()
+    return _default_resolver
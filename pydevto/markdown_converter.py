@@ -1,9 +1,17 @@
-import urllib.parse as urlparse
+import inspect
+import os
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, wait
+from itertools import islice
 
 from bs4 import BeautifulSoup, NavigableString
 import re
+import threading
+import time
+
 import six
 
+from pydevto.embeds import default_resolver, remove_scheme
 
 convert_heading_re = re.compile(r"convert_h(\d+)")
 line_beginning_re = re.compile(r"^", re.MULTILINE)
@@ -18,6 +26,27 @@ ATX_CLOSED = "atx_closed"
 UNDERLINED = "underlined"
 SETEXT = UNDERLINED
 
+# Parser backends
+HTML_PARSER = "html.parser"  # BeautifulSoup with python's html.parser, the default
+LXML = "lxml"  # BeautifulSoup with lxml
+LXML_DIRECT = "lxml-direct"  # lxml parser events converted directly, without building a BeautifulSoup tree
+AUTO = "auto"  # the fastest installed backend
+PARSERS = (HTML_PARSER, LXML, LXML_DIRECT)
+
+DEFAULT_CHUNKSIZE = 4
+
+# Bump when a change to the converter alters the markdown it produces, so cached results are not reused
+CONVERTER_VERSION = 1
+
+# Outcome of converting one document with html_to_markdown_many, index is its position in the input
+ConversionResult = namedtuple("ConversionResult", ["index", "markdown", "error"])
+
+
+# Where a tag sits in the document, tracked while walking the tree so list handlers don't need to search it:
+# index is the position of the tag among its parent's children (text nodes included), ul_depth the number of
+# ul tags among the tag and its ancestors, and in_li whether any ancestor is an li.
+TagContext = namedtuple("TagContext", ["index", "ul_depth", "in_li"])
+
 
 def escape(text):
     if not text:
@@ -25,6 +54,156 @@ def escape(text):
     return text.replace("_", r"\_")
 
 
+def available_parsers():
+    """The parser backends that can be used with the installed packages, fastest last"""
+    try:
+        import lxml  # noqa: F401
+    except ImportError:
+        return [HTML_PARSER]
+    return [HTML_PARSER, LXML, LXML_DIRECT]
+
+
+def resolve_parser(parser):
+    """Parser backend to use for the `parser` option, falling back to html.parser when lxml is not installed"""
+    if parser == AUTO:
+        return available_parsers()[-1]
+    if parser not in PARSERS:
+        raise ValueError("Unknown parser %r, use one of %s" % (parser, ", ".join(PARSERS + (AUTO,))))
+    return parser if parser in available_parsers() else HTML_PARSER
+
+
+class TagStats:
+    __slots__ = ("calls", "time")
+
+    def __init__(self):
+        self.calls = 0
+        self.time = 0.0
+
+
+class _ProfiledDispatch(dict):
+    # dispatch table of timed convert functions, filled in on first sight of each tag name
+    def __init__(self, converter, profile):
+        super().__init__()
+        self.converter = converter
+        self.profile = profile
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            convert_fn = self[name] = self.profile.timed(name, self.converter.dispatch(name))
+            return convert_fn
+
+
+class ConversionProfile:
+    """Where the time of MarkdownConverter.convert goes, opt in by passing a profile to the calls to measure
+
+    Records parse time, the number of text nodes and the time spent escaping them, calls and time of the convert
+    function of each tag name (tags without one are counted too), and input and output sizes.  Tag times are
+    the time of the convert function only, the children of a tag are converted before and counted separately.
+    With the lxml-direct backend parsing and converting are interleaved, parse time is then the rest of the time.
+
+    Pass the same profile to many calls, or merge() profiles (or their to_dict()) to aggregate a batch.  A profile
+    is not thread safe, use one per thread.
+
+    >>> profile = ConversionProfile()
+    >>> for html in posts:
+    ...     html_to_markdown(html, profile=profile)
+    >>> profile.to_dict()
+    """
+
+    def __init__(self):
+        self.documents = 0
+        self.input_size = 0
+        self.output_size = 0
+        self.total_time = 0.0
+        self.parse_time = 0.0
+        self.text_nodes = 0
+        self.text_time = 0.0
+        self.tags = {}
+
+    def instrument(self, converter):
+        """Return a timed dispatch table and process_text function for converter"""
+        process_text = converter.process_text
+
+        def timed_process_text(text):
+            start = time.perf_counter()
+            try:
+                return process_text(text)
+            finally:
+                self.text_nodes += 1
+                self.text_time += time.perf_counter() - start
+
+        return _ProfiledDispatch(converter, self), timed_process_text
+
+    def timed(self, name, convert_fn):
+        stats = self.tags.get(name)
+        if stats is None:
+            stats = self.tags[name] = TagStats()
+
+        def timed_convert(el, text, **kwargs):
+            start = time.perf_counter()
+            try:
+                return convert_fn(el, text, **kwargs) if convert_fn is not None else text
+            finally:
+                stats.calls += 1
+                stats.time += time.perf_counter() - start
+
+        return timed_convert
+
+    def start(self):
+        return time.perf_counter(), self._convert_time()
+
+    def finish(self, started, html, markdown, parsed=None):
+        """Account for one converted document, parsed is when parsing finished if it was not interleaved"""
+        start, convert_time = started
+        elapsed = time.perf_counter() - start
+        self.documents += 1
+        self.input_size += len(html)
+        self.output_size += len(markdown)
+        self.total_time += elapsed
+        if parsed is not None:
+            self.parse_time += parsed - start
+        else:
+            self.parse_time += elapsed - (self._convert_time() - convert_time)
+
+    def _convert_time(self):
+        return self.text_time + sum(stats.time for stats in self.tags.values())
+
+    def merge(self, other):
+        """Add the counts of another profile, or of its to_dict()"""
+        if isinstance(other, ConversionProfile):
+            other = other.to_dict()
+        for field in ("documents", "input_size", "output_size", "total_time", "parse_time", "text_nodes",
+                      "text_time"):
+            setattr(self, field, getattr(self, field) + other[field])
+        for name, counts in other["tags"].items():
+            stats = self.tags.get(name)
+            if stats is None:
+                stats = self.tags[name] = TagStats()
+            stats.calls += counts["calls"]
+            stats.time += counts["time"]
+        return self
+
+    def to_dict(self):
+        """The profile as plain data, tags sorted by time spent, slowest first
+
+        :return: dict with documents, input_size and output_size (characters), total_time, parse_time,
+            text_nodes, text_time (seconds) and tags, mapping each tag name to its calls and time
+        """
+        tags = sorted(self.tags.items(), key=lambda item: item[1].time, reverse=True)
+        return {
+            "documents": self.documents,
+            "input_size": self.input_size,
+            "output_size": self.output_size,
+            "total_time": self.total_time,
+            "parse_time": self.parse_time,
+            "text_nodes": self.text_nodes,
+            "text_time": self.text_time,
+            "tags": {name: {"calls": stats.calls, "time": stats.time} for name, stats in tags},
+        }
+
+
 def _todict(obj):
     return dict((k, getattr(obj, k)) for k in dir(obj) if not k.startswith("_"))
 
@@ -40,10 +219,15 @@ class MarkdownConverter(object):
         autolinks = True
         heading_style = UNDERLINED
         bullets = "*+-"  # An iterable of bullet types.
+        parser = HTML_PARSER  # One of PARSERS or AUTO
+        embeds = None  # EmbedResolver, defaults to embeds.default_resolver()
 
     class Options(DefaultOptions):
         pass
 
+    # part of the MarkdownCache key, subclasses changing their output should bump it too
+    version = CONVERTER_VERSION
+
     def __init__(self, **options):
         # Create an options dictionary. Use DefaultOptions as a base so that
         # it doesn't have to be extended.
@@ -55,33 +239,134 @@ class MarkdownConverter(object):
                 "You may specify either tags to strip or tags to"
                 " convert, but not both."
             )
-
-    def convert(self, html):
+        self.parser = resolve_parser(self.options["parser"])
+        self.embeds = self.options["embeds"] or default_resolver()
+        self._dispatch = self._build_dispatch()
+
+    def _build_dispatch(self):
+        # Map tag name -> convert function, or None for tags that are left as plain text, so process_tag does a
+        # single dict lookup per node.  Covers every convert_* method (including those added by subclasses) and
+        # the headings; any other tag name is resolved once on first sight by dispatch().
+        names = [attr[len("convert_"):] for attr in dir(self) if attr.startswith("convert_")]
+        names += ["h%s" % n for n in range(1, 7)]
+        self._context_names = set()
+        dispatch = {}
+        for name in names:
+            self.dispatch(name, dispatch)
+        return dispatch
+
+    def dispatch(self, name, table=None):
+        """Return the convert function for a tag name, or None when the tag should not be converted"""
+        table = self._dispatch if table is None else table
+        try:
+            return table[name]
+        except KeyError:
+            convert_fn = getattr(self, "convert_%s" % name, None)
+            if convert_fn is None or not self.should_convert_tag(name):
+                convert_fn = None
+            elif "context" in inspect.signature(convert_fn).parameters:
+                self._context_names.add(name)
+            table[name] = convert_fn
+            return convert_fn
+
+    def convert(self, html, profile=None):
         # We want to take advantage of the html5 parsing, but we don't actually
         # want a full document. Therefore, we'll mark our fragment with an id,
         # create the document, and extract the element with the id.
-        html = wrapped % html
-        soup = BeautifulSoup(html, "html.parser")
-        return self.process_tag(soup.find(id=FRAGMENT_ID), children_only=True)
-
-    def process_tag(self, node, children_only=False):
-        text = ""
-
-        # Convert the children first
-        for el in node.children:
-            if isinstance(el, NavigableString):
-                text += self.process_text(six.text_type(el))
+        #
+        # With the lxml-direct backend the parser events are converted as they come instead, convert functions
+        # then get markdown_stream.StreamElement objects rather than BeautifulSoup tags.
+        started = profile.start() if profile is not None else None
+        if self.parser == LXML_DIRECT:
+            # imported here because markdown_stream builds on this module
+            from pydevto.markdown_stream import LxmlStreamParser
+
+            parser = LxmlStreamParser(self, profile)
+            parser.feed(html)
+            parser.close()
+            markdown = parser.pop_output()
+            parsed = None
+        else:
+            soup = BeautifulSoup(wrapped % html, self.parser)
+            parsed = time.perf_counter() if profile is not None else None
+            markdown = self.process_tag(soup.find(id=FRAGMENT_ID), children_only=True, profile=profile)
+        if profile is not None:
+            profile.finish(started, html, markdown, parsed)
+        return markdown
+
+    def process_tag(self, node, children_only=False, profile=None):
+        # Walk the tree with an explicit stack instead of recursing, so nesting depth is not limited by the
+        # recursion limit.  Each frame collects the converted children of its node in a list of fragments that is
+        # joined once when the node is done, instead of growing a string with every child.  Frames also carry the
+        # node's TagContext, which convert functions accepting a `context` argument receive.
+        dispatch = self._dispatch
+        process_text = self.process_text
+        if profile is not None:
+            dispatch, process_text = profile.instrument(self)
+        context_names = self._context_names
+        missing = dispatch  # sentinel, never a value of the table
+        index, ul_depth, in_li = self.context_of(node, with_index=not children_only)
+        stack = [(node, enumerate(node.children), [], index, ul_depth, in_li)]
+        while True:
+            el, children, parts, index, ul_depth, in_li = stack[-1]
+            for position, child in children:
+                if isinstance(child, NavigableString):
+                    parts.append(process_text(six.text_type(child)))
+                else:
+                    stack.append(
+                        (
+                            child,
+                            enumerate(child.children),
+                            [],
+                            position,
+                            ul_depth + (child.name == "ul"),
+                            in_li or el.name == "li",
+                        )
+                    )
+                    break
             else:
-                text += self.process_tag(el)
-
-        if not children_only:
-            convert_fn = getattr(self, "convert_%s" % node.name, None)
-            if convert_fn and self.should_convert_tag(node.name):
-                text = convert_fn(node, text)
-            # else:
-            #     text = text + node.name
-
-        return text
+                stack.pop()
+                text = "".join(parts)
+                if stack or not children_only:
+                    convert_fn = dispatch.get(el.name, missing)
+                    if convert_fn is missing:
+                        convert_fn = self.dispatch(el.name)
+                    if convert_fn is not None:
+                        if el.name in context_names:
+                            text = convert_fn(el, text, context=TagContext(index, ul_depth, in_li))
+                        else:
+                            text = convert_fn(el, text)
+                if not stack:
+                    return text
+                stack[-1][2].append(text)
+
+    def _convert_node(self, el, text, index=None, ul_depth=0, in_li=False, dispatch=None):
+        """Convert one element given the converted text of its children, what process_tag does inline per node"""
+        dispatch = self._dispatch if dispatch is None else dispatch
+        convert_fn = dispatch.get(el.name, dispatch)  # the table itself is the missing sentinel
+        if convert_fn is dispatch:
+            convert_fn = self.dispatch(el.name)
+        if convert_fn is None:
+            return text
+        if el.name in self._context_names:
+            return convert_fn(el, text, context=TagContext(index, ul_depth, in_li))
+        return convert_fn(el, text)
+
+    def context_of(self, el, with_index=True):
+        """Compute the TagContext of an element by searching the tree, process_tag tracks it instead"""
+        index = None
+        if with_index and el.parent is not None:
+            index = el.parent.index(el)
+        ul_depth = 0
+        in_li = False
+        node = el
+        while node is not None:
+            if node.name == "ul":
+                ul_depth += 1
+            if node.name == "li" and node is not el:
+                in_li = True
+            node = node.parent
+        return TagContext(index, ul_depth, in_li)
 
     def process_text(self, text):
         return escape(whitespace_re.sub(" ", text or ""))
@@ -148,68 +433,13 @@ class MarkdownConverter(object):
         return "  \n"
 
     def remove_scheme(self, url):
-        return (
-            url.replace("https://www.", "//")
-            .replace("https://", "//")
-            .replace("http://www.", "//")
-            .replace("http://", "//")
-        )
+        return remove_scheme(url)
 
     def convert_iframe(self, el, text):
-        src = self.remove_scheme(el.attrs.get("src"))
-        if src.startswith("//cdn.unfurl.dev/embed?"):
-            src = urlparse.unquote(src)
-            query = urlparse.urlsplit(src).query
-            params = urlparse.parse_qs(query)
-            if params.get("url"):
-                embed = params.get("url")[0]
-                return self.pydevto_embed(embed)
-
-        if src.startswith("//cdn.embedly.com"):
-            src = urlparse.unquote(src)
-            query = urlparse.urlsplit(src).query
-            params = urlparse.parse_qs(query)
-            if params.get("src"):
-                embed = params.get("src")[0]
-                return self.pydevto_embed(embed)
-
-        return self.pydevto_embed(el.attrs.get("src"))
+        return self.pydevto_embed(self.embeds.unwrap(el.attrs.get("src")))
 
     def pydevto_embed(self, url):
-        original_url = url
-        url = self.remove_scheme(url)
-
-        if url.startswith("//twitter.com"):
-            q = urlparse.urlsplit(url)
-            return "\n{% twitter " + q.path.split("/")[-1] + " %}\n"
-
-        if url.startswith("//youtube.com"):
-            q = urlparse.urlsplit(url)
-            if q.path.startswith("/embed/"):
-                return "\n{% youtube " + q.path.replace("/embed/", "") + " %}\n"
-            v = urlparse.parse_qs(q.query)["v"][0]
-            return "\n{% youtube " + v + " %}\n"
-
-        if url.startswith("//codepen.io"):
-            return "\n{% codepen " + original_url + " %}\n"
-
-        if url.startswith("//soundcloud.com"):
-            return "\n{% soundcloud " + original_url + " %}\n"
-
-        if url.startswith("//github.com"):
-            return "\n{% github " + original_url + " %}\n"
-
-        if url.startswith("//instagram.com"):
-            q = urlparse.urlsplit(url)
-            return (
-                "\n{% instagram " + q.path.replace("/p", "").replace("/", "") + " %}\n"
-            )
-
-        if url.startswith("//repl.it"):
-            q = urlparse.urlsplit(url)
-            return "\n{% replit " + q.path[1:] + " %}\n"
-
-        return "\n" + original_url + "\n"
+        return self.embeds.resolve(url)
 
     def convert_em(self, el, text):
         return "*%s*" % text if text else ""
@@ -228,32 +458,23 @@ class MarkdownConverter(object):
     def convert_i(self, el, text):
         return self.convert_em(el, text)
 
-    def convert_list(self, el, text):
-        nested = False
-        while el:
-            if el.name == "li":
-                nested = True
-                break
-            el = el.parent
-        if nested:
+    def convert_list(self, el, text, context=None):
+        context = context or self.context_of(el, with_index=False)
+        if context.in_li:
             text = "\n" + self.indent(text, 1)
         return "\n" + text + "\n"
 
     convert_ul = convert_list
     convert_ol = convert_list
 
-    def convert_li(self, el, text):
+    def convert_li(self, el, text, context=None):
+        context = context or self.context_of(el)
         parent = el.parent
         if parent is not None and parent.name == "ol":
-            bullet = "%s." % (parent.index(el) + 1)
+            bullet = "%s." % (context.index + 1)
         else:
-            depth = -1
-            while el:
-                if el.name == "ul":
-                    depth += 1
-                el = el.parent
             bullets = self.options["bullets"]
-            bullet = bullets[depth % len(bullets)]
+            bullet = bullets[(context.ul_depth - 1) % len(bullets)]
         return "%s %s\n" % (bullet, text or "")
 
     def convert_p(self, el, text):
@@ -270,6 +491,111 @@ class MarkdownConverter(object):
         return "![%s](%s%s)" % (alt, src, title_part)
 
 
-def html_to_markdown(html):
+_default_converters = {}
+_default_converter_lock = threading.Lock()
+
+
+def default_converter(parser=None):
+    """The shared converter used by html_to_markdown, one per parser backend
+
+    Converters keep no state between calls, so one instance is safely shared by all threads and the cost of
+    building its options and dispatch table is paid once.
+
+    :param parser: parser backend, see PARSERS, defaults to html.parser
+    """
+    parser = parser or HTML_PARSER
+    converter = _default_converters.get(parser)
+    if converter is None:
+        with _default_converter_lock:
+            converter = _default_converters.get(parser)
+            if converter is None:
+                converter = _default_converters[parser] = MarkdownConverter(heading_style="atx", parser=parser)
+    return converter
+
+
+def html_to_markdown(html, parser=None, cache=None, profile=None):
+    """Convert html to dev.to markdown
+
+    :param html: html string
+    :param parser: parser backend, one of PARSERS or AUTO, defaults to html.parser
+    :param cache: (optional) MarkdownCache to reuse the markdown of html converted before
+    :param profile: (optional) ConversionProfile to record where the conversion time goes
+    """
     html = html.replace("<hr>", "<p>---</p>")
-    return MarkdownConverter(heading_style="atx").convert(html)
+    converter = default_converter(parser)
+    if cache is None:
+        return converter.convert(html, profile)
+    key = cache.key(html, converter)
+    markdown = cache.get(key)
+    if markdown is None:
+        markdown = converter.convert(html, profile)
+        cache.set(key, markdown)
+    return markdown
+
+
+def _init_worker(parser):
+    # build the converter (options, dispatch table) once per worker process instead of with the first document
+    default_converter(parser)
+
+
+def _convert_chunk(chunk, parser):
+    results = []
+    for index, html in chunk:
+        try:
+            results.append(ConversionResult(index, html_to_markdown(html, parser), None))
+        except Exception as e:
+            results.append(ConversionResult(index, None, e))
+    return results
+
+
+def html_to_markdown_many(htmls, workers=None, chunksize=DEFAULT_CHUNKSIZE, ordered=True, parser=None):
+    """Convert many html documents in parallel using a pool of worker processes
+
+    Conversion is cpu bound, so processes are used to get around the GIL.  Documents are consumed lazily and
+    sent to the workers in chunks, with at most 2 chunks per worker in flight.  A document that fails to
+    convert is reported in its ConversionResult and does not stop the rest of the batch.
+
+    >>> for result in html_to_markdown_many(post["body_html"] for post in posts):
+    ...     markdowns[result.index] = result.markdown
+
+    :param htmls: iterable of html strings
+    :param workers: number of worker processes, defaults to the number of cpus
+    :param chunksize: number of documents sent to a worker at a time, raise it for many small documents
+    :param ordered: True to yield results in the order of htmls, otherwise they are yielded as chunks complete
+    :param parser: parser backend, see html_to_markdown
+    :return: iterator of ConversionResult(index, markdown, error)
+    """
+    # imported here, multiprocessing adds to the import time of every user of html_to_markdown
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    documents = enumerate(htmls)
+    window = workers * 2
+    # future -> indexes of its documents, in submission order
+    pending = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(parser,)) as executor:
+        try:
+            while True:
+                while len(pending) < window:
+                    chunk = list(islice(documents, chunksize))
+                    if not chunk:
+                        break
+                    pending[executor.submit(_convert_chunk, chunk, parser)] = [index for index, _ in chunk]
+                if not pending:
+                    return
+                if ordered:
+                    done = [next(iter(pending))]
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    indexes = pending.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        yield from future.result()
+                    else:
+                        # the worker died or the results could not be sent back
+                        for index in indexes:
+                            yield ConversionResult(index, None, error)
+        finally:
+            for future in pending:
+                future.cancel()
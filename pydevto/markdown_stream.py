@@ -0,0 +1,411 @@
+import codecs
+import html
+import re
+from html.parser import HTMLParser
+
+from bs4.dammit import EntitySubstitution
+
+from pydevto.markdown_converter import FRAGMENT_ID, HTML_PARSER, default_converter, wrapped
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Tags that never have content, closed as soon as they open (same list as BeautifulSoup's html tree builder)
+VOID_ELEMENTS = frozenset(
+    [
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "keygen",
+        "link",
+        "menuitem",
+        "meta",
+        "param",
+        "source",
+        "track",
+        "wbr",
+        "basefont",
+        "bgsound",
+        "command",
+        "frame",
+        "image",
+        "isindex",
+        "nextid",
+        "spacer",
+    ]
+)
+
+# Attributes whose value is a whitespace separated list, per tag name ("*" for all tags), split like BeautifulSoup
+LIST_ATTRIBUTES = {
+    "*": {"class", "accesskey", "dropzone"},
+    "a": {"rel", "rev"},
+    "link": {"rel", "rev"},
+    "td": {"headers"},
+    "th": {"headers"},
+    "form": {"accept-charset"},
+    "object": {"archive"},
+    "area": {"rel"},
+    "icon": {"sizes"},
+    "iframe": {"sandbox"},
+    "output": {"for"},
+}
+
+nonwhitespace_re = re.compile(r"\S+")
+
+
+class StreamElement:
+    """Lightweight stand-in for a BeautifulSoup tag, handed to the convert functions while streaming
+
+    Supports what the convert functions use: `name`, `attrs`, `parent`, `get()` and `find_all()`.  Child elements
+    are only kept below elements that have a convert function, so find_all() sees every descendant there.
+    """
+
+    __slots__ = ("name", "attrs", "parent", "contents")
+
+    def __init__(self, name, attrs, parent=None):
+        self.name = name
+        self.attrs = attrs
+        self.parent = parent
+        self.contents = []
+
+    def get(self, key, default=None):
+        return self.attrs.get(key, default)
+
+    def __getitem__(self, key):
+        return self.attrs[key]
+
+    def find_all(self, name):
+        found = []
+        stack = list(reversed(self.contents))
+        while stack:
+            el = stack.pop()
+            if el.name == name:
+                found.append(el)
+            stack.extend(reversed(el.contents))
+        return found
+
+    def __repr__(self):
+        return "<%s>" % self.name
+
+
+class _Frame:
+    __slots__ = ("el", "parts", "index", "ul_depth", "in_li", "children", "streaming")
+
+    def __init__(self, el, index, ul_depth, in_li, streaming):
+        self.el = el
+        self.parts = []
+        self.index = index
+        self.ul_depth = ul_depth
+        self.in_li = in_li
+        self.children = 0
+        self.streaming = streaming
+
+
+class MarkdownBuilder:
+    """Converts start, end and text events to markdown, converting each element as soon as it closes
+
+    Open elements are kept on a stack.  Elements without a convert function (div, span, body, ...) just
+    concatenate their children, so their finished children are emitted right away instead of being buffered,
+    which bounds memory by the nesting depth and the size of the largest converted block.  Collect the finished
+    markdown with pop_output().
+
+    Only the content of the fragment wrapper (see MarkdownConverter.convert) is converted, events before it opens
+    and after it closes are ignored.  end() pops up to the most recent open element of that name and ignores end
+    tags without one, like BeautifulSoup.
+    """
+
+    def __init__(self, converter=None, profile=None):
+        """
+
+        :param converter: MarkdownConverter whose convert functions are used, defaults to default_converter()
+        :param profile: (optional) ConversionProfile to record the time of the convert functions in
+        """
+        self.converter = converter or default_converter()
+        self._dispatch = None
+        self._process_text = self.converter.process_text
+        if profile is not None:
+            self._dispatch, self._process_text = profile.instrument(self.converter)
+        self.output = []
+        self._stack = []
+        self._text = []
+        self._started = False
+        self._done = False
+
+    def pop_output(self):
+        """Return the markdown finished since the last call"""
+        output = "".join(self.output)
+        self.output = []
+        return output
+
+    def start(self, name, attrs):
+        self._flush_text()
+        if self._done:
+            return
+        if not self._started:
+            if attrs.get("id") == FRAGMENT_ID:
+                self._started = True
+                self._stack.append(_Frame(StreamElement(name, attrs), None, int(name == "ul"), False, True))
+            return
+        parent = self._stack[-1]
+        el = StreamElement(name, attrs, parent.el)
+        if not parent.streaming:
+            parent.el.contents.append(el)
+        streaming = parent.streaming and self.converter.dispatch(name) is None
+        self._stack.append(
+            _Frame(
+                el,
+                parent.children,
+                parent.ul_depth + (name == "ul"),
+                parent.in_li or parent.el.name == "li",
+                streaming,
+            )
+        )
+        parent.children += 1
+
+    def end(self, name):
+        self._flush_text()
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i].el.name == name:
+                while len(self._stack) > i:
+                    self._pop()
+                return
+
+    def data(self, data):
+        self._text.append(data)
+
+    def string(self, data):
+        """Add text that is a node of its own, eg. a comment, instead of being merged with the text around it"""
+        self._flush_text()
+        self._text.append(data)
+        self._flush_text()
+
+    def close(self):
+        self._flush_text()
+        while self._stack:
+            self._pop()
+
+    def _emit(self, text):
+        frame = self._stack[-1]
+        if frame.streaming:
+            if text:
+                self.output.append(text)
+        else:
+            frame.parts.append(text)
+
+    def _flush_text(self):
+        if self._text and self._stack:
+            frame = self._stack[-1]
+            frame.children += 1
+            self._emit(self._process_text("".join(self._text)))
+        self._text = []
+
+    def _pop(self):
+        frame = self._stack.pop()
+        text = "".join(frame.parts)
+        if not self._stack:
+            # the fragment wrapper closed, anything after it is outside the converted html
+            self._done = True
+            if text:
+                self.output.append(text)
+            return
+        self._emit(
+            self.converter._convert_node(
+                frame.el, text, frame.index, frame.ul_depth, frame.in_li, dispatch=self._dispatch
+            )
+        )
+
+
+def attributes(name, items):
+    """Attribute dict of a tag like BeautifulSoup builds it: last value wins and list attributes are split"""
+    attrs = {}
+    list_attributes = LIST_ATTRIBUTES.get(name, ()), LIST_ATTRIBUTES["*"]
+    for key, value in items:
+        value = "" if value is None else value
+        if key in list_attributes[0] or key in list_attributes[1]:
+            value = nonwhitespace_re.findall(value)
+        attrs[key] = value
+    return attrs
+
+
+class MarkdownStreamParser(HTMLParser):
+    """Incremental html to markdown conversion driven by html.parser events, without building a tree
+
+    Feed html with feed() and collect the finished markdown with pop_output().  Events are handled the way
+    BeautifulSoup's html.parser builder handles them (void elements, stray end tags, entities, comments), so the
+    output is the same as MarkdownConverter.convert with the html.parser backend.
+    """
+
+    def __init__(self, converter=None, profile=None):
+        """
+
+        :param converter: MarkdownConverter whose convert functions are used, defaults to default_converter()
+        :param profile: (optional) ConversionProfile to record the time of the convert functions in
+        """
+        super().__init__(convert_charrefs=False)
+        self.builder = MarkdownBuilder(converter, profile)
+        self._already_closed = []
+        super().feed(wrapped.split("%s")[0])
+
+    def pop_output(self):
+        return self.builder.pop_output()
+
+    def close(self):
+        super().feed(wrapped.split("%s")[1])
+        super().close()
+        self.builder.close()
+
+    def handle_starttag(self, tag, attrs, handle_empty_element=True):
+        self.builder.start(tag, attributes(tag, attrs))
+        if tag in VOID_ELEMENTS and handle_empty_element:
+            # an explicit end tag may still follow, it is ignored
+            self.handle_endtag(tag, check_already_closed=False)
+            self._already_closed.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, handle_empty_element=False)
+        self.handle_endtag(tag, check_already_closed=False)
+
+    def handle_endtag(self, tag, check_already_closed=True):
+        if check_already_closed and tag in self._already_closed:
+            self._already_closed.remove(tag)
+        else:
+            self.builder.end(tag)
+
+    def handle_data(self, data):
+        self.builder.data(data)
+
+    def handle_charref(self, name):
+        self.builder.data(html.unescape("&#%s;" % name))
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.builder.data(character if character is not None else "&%s" % name)
+
+    def handle_comment(self, data):
+        self.builder.string(data)
+
+    def handle_decl(self, decl):
+        self.builder.string(decl[len("DOCTYPE "):])
+
+    def unknown_decl(self, data):
+        self.builder.string(data[len("CDATA["):] if data.upper().startswith("CDATA[") else data)
+
+    def handle_pi(self, data):
+        self.builder.string(data)
+
+
+class LxmlMarkdownTarget(MarkdownBuilder):
+    """MarkdownBuilder used as the target of an lxml parser, so lxml events are converted without building a tree"""
+
+    def start(self, tag, attrib):
+        super().start(tag, attributes(tag, attrib.items()))
+
+    def comment(self, text):
+        self.string(text)
+
+    def pi(self, target, data=None):
+        self.string("%s %s" % (target, data) if data else target)
+
+
+class LxmlStreamParser:
+    """Incremental html to markdown conversion using libxml2's html parser through lxml, see MarkdownBuilder
+
+    libxml2 fixes up invalid html differently than html.parser, eg. it closes an open <p> when a block element
+    starts, so output for broken html can differ from the html.parser backend.
+    """
+
+    def __init__(self, converter=None, profile=None):
+        from lxml import etree
+
+        self.builder = LxmlMarkdownTarget(converter, profile)
+        self._parser = etree.HTMLParser(target=self.builder)
+        self._parser.feed(wrapped.split("%s")[0])
+
+    def feed(self, data):
+        self._parser.feed(data)
+
+    def pop_output(self):
+        return self.builder.pop_output()
+
+    def close(self):
+        self._parser.feed(wrapped.split("%s")[1])
+        self._parser.close()
+
+
+def stream_parser(converter=None):
+    """Incremental parser for the backend of the converter, with feed(), close() and pop_output()"""
+    converter = converter or default_converter()
+    if converter.parser == HTML_PARSER:
+        return MarkdownStreamParser(converter)
+    return LxmlStreamParser(converter)
+
+
+def iter_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Iterate over the text of a string, bytes, file object or iterable of chunks, decoding bytes as utf-8"""
+    if isinstance(source, (str, bytes)):
+        chunks = (source[i:i + chunk_size] for i in range(0, len(source), chunk_size))
+    elif hasattr(source, "read"):
+        chunks = iter(lambda: source.read(chunk_size), source.read(0))
+    else:
+        chunks = source
+    decoder = None
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            decoder = decoder or codecs.getincrementaldecoder("utf-8")()
+            chunk = decoder.decode(chunk)
+        if chunk:
+            yield chunk
+    if decoder is not None:
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+
+def replace_chunks(chunks, old, new):
+    """Like str.replace on the joined chunks, also replacing occurrences split over two chunks"""
+    tail = ""
+    for chunk in chunks:
+        chunk = tail + chunk
+        # hold back the end of the chunk if it could be the start of an occurrence
+        keep = next((n for n in range(len(old) - 1, 0, -1) if chunk.endswith(old[:n])), 0)
+        tail = chunk[len(chunk) - keep:]
+        yield chunk[:len(chunk) - keep].replace(old, new)
+    if tail:
+        yield tail
+
+
+def stream_markdown(source, converter=None, chunk_size=DEFAULT_CHUNK_SIZE, horizontal_rules=False):
+    """Convert html to markdown incrementally, yielding markdown as soon as each block is finished
+
+    :param source: html as a string, bytes, a file object or an iterable of str or bytes chunks
+    :param converter: MarkdownConverter to use, defaults to default_converter()
+    :param chunk_size: number of characters read at a time from strings and file objects
+    :param horizontal_rules: True to convert <hr> to ---, like html_to_markdown does
+    """
+    parser = stream_parser(converter)
+    chunks = iter_chunks(source, chunk_size)
+    if horizontal_rules:
+        chunks = replace_chunks(chunks, "<hr>", "<p>---</p>")
+    for chunk in chunks:
+        parser.feed(chunk)
+        output = parser.pop_output()
+        if output:
+            yield output
+    parser.close()
+    output = parser.pop_output()
+    if output:
+        yield output
+
+
+def html_to_markdown_stream(source, chunk_size=DEFAULT_CHUNK_SIZE, parser=None):
+    """Streaming version of html_to_markdown, "".join() of the chunks equals html_to_markdown(html)
+
+    >>> with open("export.html", encoding="utf-8") as f:
+    ...     for markdown in html_to_markdown_stream(f):
+    ...         out.write(markdown)
+    """
+    return stream_markdown(source, default_converter(parser), chunk_size=chunk_size, horizontal_rules=True)
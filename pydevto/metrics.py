@@ -0,0 +1,225 @@
+import bisect
+import re
+import threading
+import time
+
+# Upper bounds in seconds of the latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+id_segment_re = re.compile(r"/\d+(?=/|$)")
+
+
+class RequestEvent:
+    """What happened during one api call, handed to RequestObserver hooks
+
+    `endpoint` is the request path with numeric ids replaced by {id}, eg. /articles/{id}.  The fields filled in
+    after the call are None when they do not apply, eg. status_code for a response served from the cache.
+    """
+
+    __slots__ = (
+        "method",
+        "path",
+        "endpoint",
+        "started",
+        "elapsed",
+        "status_code",
+        "bytes_sent",
+        "bytes_received",
+        "decode_time",
+        "retries",
+        "cache",
+        "error",
+    )
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.endpoint = id_segment_re.sub("/{id}", path.split("?", 1)[0])
+        self.started = time.perf_counter()
+        self.elapsed = None
+        self.status_code = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.decode_time = 0.0
+        self.retries = 0
+        self.cache = None  # "hit" or "revalidated" when a cached response was used
+        self.error = None
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started
+
+
+class RequestObserver:
+    """Base class for request hooks, pass instances to the client with `observers=[...]`
+
+    Hooks are called synchronously on the thread (or event loop) making the request, so keep them fast.
+    """
+
+    def before_request(self, event):
+        pass
+
+    def after_request(self, event):
+        pass
+
+
+class _EndpointStats:
+    __slots__ = (
+        "count",
+        "buckets",
+        "latency_sum",
+        "bytes_sent",
+        "bytes_received",
+        "decode_time",
+        "retries",
+        "errors",
+        "cache_hits",
+        "status_codes",
+    )
+
+    def __init__(self, n_buckets):
+        self.count = 0
+        self.buckets = [0] * (n_buckets + 1)
+        self.latency_sum = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.decode_time = 0.0
+        self.retries = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.status_codes = {}
+
+
+class MetricsCollector(RequestObserver):
+    """In-process request metrics per (method, endpoint)
+
+    Keeps a latency histogram, bytes sent and received, status code counts, json decode time, retries, errors
+    and cache hits, plus the number of requests in flight and its peak, which is what a connection pool should
+    be sized to.
+
+    >>> metrics = MetricsCollector()
+    >>> api = PyDevTo(observers=[metrics])
+    >>> api.tags()
+    >>> print(metrics.prometheus())
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, namespace="pydevto"):
+        """
+
+        :param buckets: upper bounds in seconds of the latency histogram buckets
+        :param namespace: prefix of the prometheus metric names
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.namespace = namespace
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def before_request(self, event):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def after_request(self, event):
+        with self._lock:
+            self.in_flight -= 1
+            key = (event.method, event.endpoint)
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _EndpointStats(len(self.buckets))
+            stats.count += 1
+            stats.buckets[bisect.bisect_left(self.buckets, event.elapsed)] += 1
+            stats.latency_sum += event.elapsed
+            stats.bytes_sent += event.bytes_sent
+            stats.bytes_received += event.bytes_received
+            stats.decode_time += event.decode_time
+            stats.retries += event.retries
+            if event.error is not None:
+                stats.errors += 1
+            if event.cache == "hit":
+                stats.cache_hits += 1
+            if event.status_code is not None:
+                stats.status_codes[event.status_code] = stats.status_codes.get(event.status_code, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.max_in_flight = self.in_flight
+
+    def to_dict(self):
+        """Snapshot of all metrics
+
+        :return: dict with in_flight, max_in_flight and per "METHOD /endpoint" stats, where latency.buckets maps
+            each bucket upper bound to the number of requests that took at most that long (cumulative)
+        """
+        with self._lock:
+            endpoints = {}
+            for (method, endpoint), stats in sorted(self._stats.items()):
+                cumulative = 0
+                buckets = {}
+                for bound, count in zip(self.buckets + (float("inf"),), stats.buckets):
+                    cumulative += count
+                    buckets[bound] = cumulative
+                endpoints["%s %s" % (method, endpoint)] = {
+                    "count": stats.count,
+                    "latency": {"sum": stats.latency_sum, "buckets": buckets},
+                    "bytes_sent": stats.bytes_sent,
+                    "bytes_received": stats.bytes_received,
+                    "decode_time": stats.decode_time,
+                    "retries": stats.retries,
+                    "errors": stats.errors,
+                    "cache_hits": stats.cache_hits,
+                    "status_codes": dict(stats.status_codes),
+                }
+            return {"in_flight": self.in_flight, "max_in_flight": self.max_in_flight, "endpoints": endpoints}
+
+    def prometheus(self):
+        """All metrics in the prometheus text exposition format"""
+        ns = self.namespace
+        snapshot = self.to_dict()
+        lines = []
+
+        def metric(name, kind, help, samples):
+            lines.append("# HELP %s_%s %s" % (ns, name, help))
+            lines.append("# TYPE %s_%s %s" % (ns, name, kind))
+            for suffix, labels, value in samples:
+                label_text = ",".join('%s="%s"' % item for item in labels)
+                lines.append("%s_%s%s{%s} %s" % (ns, name, suffix, label_text, _number(value)))
+
+        def per_endpoint(field):
+            for key, stats in snapshot["endpoints"].items():
+                method, endpoint = key.split(" ", 1)
+                yield "", [("method", method), ("endpoint", endpoint)], stats[field]
+
+        histogram = []
+        for key, stats in snapshot["endpoints"].items():
+            method, endpoint = key.split(" ", 1)
+            labels = [("method", method), ("endpoint", endpoint)]
+            for bound, count in stats["latency"]["buckets"].items():
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                histogram.append(("_bucket", labels + [("le", le)], count))
+            histogram.append(("_sum", labels, stats["latency"]["sum"]))
+            histogram.append(("_count", labels, stats["count"]))
+        metric("request_duration_seconds", "histogram", "Api call latency, including retries.", histogram)
+
+        statuses = []
+        for key, stats in snapshot["endpoints"].items():
+            method, endpoint = key.split(" ", 1)
+            for status, count in sorted(stats["status_codes"].items()):
+                statuses.append(("", [("method", method), ("endpoint", endpoint), ("status", status)], count))
+        metric("responses_total", "counter", "Responses by http status.", statuses)
+
+        metric("request_bytes_total", "counter", "Request body bytes sent.", per_endpoint("bytes_sent"))
+        metric("response_bytes_total", "counter", "Response body bytes received.", per_endpoint("bytes_received"))
+        metric("json_decode_seconds_total", "counter", "Time spent decoding json.", per_endpoint("decode_time"))
+        metric("retries_total", "counter", "Retried requests.", per_endpoint("retries"))
+        metric("errors_total", "counter", "Calls that raised an exception.", per_endpoint("errors"))
+        metric("cache_hits_total", "counter", "Calls served from the response cache.", per_endpoint("cache_hits"))
+        lines.append("# HELP %s_requests_in_flight Requests currently in flight." % ns)
+        lines.append("# TYPE %s_requests_in_flight gauge" % ns)
+        lines.append("%s_requests_in_flight %s" % (ns, snapshot["in_flight"]))
+        return "\n".join(lines) + "\n"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -0,0 +1,161 @@
+import argparse
+import json
+import sqlite3
+
+from pydevto.models import Model
+
+DEFAULT_PER_PAGE = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    published_at TEXT,
+    edited_at TEXT,
+    data TEXT
+);
+CREATE TABLE IF NOT EXISTS article_sources (
+    source TEXT,
+    id INTEGER,
+    PRIMARY KEY (source, id)
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    source TEXT PRIMARY KEY,
+    next_page INTEGER,
+    complete INTEGER,
+    backfilled INTEGER
+);
+"""
+
+
+def source_key(tag=None, username=None):
+    if bool(tag) == bool(username):
+        raise ValueError("Mirror either a tag or a username")
+    return "tag:%s" % tag if tag else "username:%s" % username
+
+
+class ArticleMirror:
+    """Incremental local mirror of the public articles of tags and usernames, stored in sqlite
+
+    The first sync of a source pages through all of its articles.  Later syncs page newest first and stop at the
+    first page without new or edited articles, so a nightly run only downloads what changed.  Progress is
+    checkpointed after every page, in the same transaction as the articles, so an interrupted export resumes at
+    the page it stopped on.
+
+    >>> mirror = ArticleMirror(PyDevTo(), "articles.sqlite")
+    >>> mirror.sync(tag="python")
+    {'pages': 3, 'new': 250, 'updated': 0}
+    """
+
+    def __init__(self, api, path, per_page=DEFAULT_PER_PAGE):
+        """
+
+        :param api: PyDevTo client
+        :param path: sqlite file to store the articles in
+        :param per_page: page size used when paging through public_articles
+        """
+        self.api = api
+        self.per_page = per_page
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def checkpoint(self, source):
+        row = self.db.execute(
+            "SELECT next_page, complete, backfilled FROM checkpoints WHERE source = ?", (source,)
+        ).fetchone()
+        if row is None:
+            return 1, True, False
+        return row[0], bool(row[1]), bool(row[2])
+
+    def sync(self, tag=None, username=None):
+        """Download the new and edited articles of a tag or username
+
+        :param tag: tag to mirror
+        :param username: user or organization to mirror
+        :return: dict with the number of pages fetched and of new and updated articles
+        """
+        source = source_key(tag, username)
+        stats = {"pages": 0, "new": 0, "updated": 0}
+        next_page, complete, _ = self.checkpoint(source)
+        self._sync_pass(source, tag, username, 1 if complete else next_page, stats)
+        if not complete and next_page > 1:
+            # articles published while the interrupted pass was paused sit in front of where it resumed
+            self._sync_pass(source, tag, username, 1, stats)
+        return stats
+
+    def _sync_pass(self, source, tag, username, page, stats):
+        _, _, backfilled = self.checkpoint(source)
+        while True:
+            articles = self.api.public_articles(page=page, tag=tag, username=username, per_page=self.per_page)
+            stats["pages"] += 1
+            with self.db:
+                changed = self._store(source, articles, stats)
+                end = len(articles) < self.per_page
+                backfilled = backfilled or end
+                done = end or (backfilled and not changed)
+                self.db.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)",
+                    (source, 1 if done else page + 1, done, backfilled),
+                )
+            if done:
+                return
+            page += 1
+
+    def _store(self, source, articles, stats):
+        changed = 0
+        for article in articles:
+            row = self.db.execute(
+                "SELECT published_at, edited_at FROM articles WHERE id = ?", (article["id"],)
+            ).fetchone()
+            version = (article.get("published_at"), article.get("edited_at"))
+            if row is None or tuple(row) != version:
+                stats["updated" if row else "new"] += 1
+                changed += 1
+                self.db.execute(
+                    "INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?)",
+                    (article["id"], version[0], version[1], json.dumps(article, default=Model.to_dict)),
+                )
+            self.db.execute("INSERT OR IGNORE INTO article_sources VALUES (?, ?)", (source, article["id"]))
+        return changed
+
+    def articles(self, tag=None, username=None):
+        """Iterate over the stored articles, newest first, optionally only those of one tag or username"""
+        if tag or username:
+            rows = self.db.execute(
+                "SELECT data FROM articles JOIN article_sources USING (id) WHERE source = ? "
+                "ORDER BY published_at DESC",
+                (source_key(tag, username),),
+            )
+        else:
+            rows = self.db.execute("SELECT data FROM articles ORDER BY published_at DESC")
+        for (data,) in rows:
+            yield json.loads(data)
+
+
+def main(argv=None):
+    from pydevto.pydevto import PyDevTo
+
+    parser = argparse.ArgumentParser(description="Incrementally mirror dev.to articles into a sqlite file")
+    parser.add_argument("path", help="sqlite file to store the articles in")
+    parser.add_argument("--tag", action="append", default=[], help="tag to mirror, can be repeated")
+    parser.add_argument("--username", action="append", default=[], help="username to mirror, can be repeated")
+    parser.add_argument("--per-page", type=int, default=DEFAULT_PER_PAGE)
+    args = parser.parse_args(argv)
+
+    with PyDevTo() as api, ArticleMirror(api, args.path, per_page=args.per_page) as mirror:
+        for tag in args.tag:
+            print("tag %s: %s" % (tag, mirror.sync(tag=tag)))
+        for username in args.username:
+            print("username %s: %s" % (username, mirror.sync(username=username)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import zlib
+
+# Text fields shorter than this are kept as plain strings, compressing them would not save anything
+LAZY_TEXT_THRESHOLD = 256
+
+
+class LazyText:
+    """Descriptor keeping a large text field zlib compressed until it is first read"""
+
+    def __init__(self, name):
+        self.name = name
+        self.slot = "_" + name
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+        value = getattr(obj, self.slot, None)
+        if isinstance(value, bytes):
+            value = zlib.decompress(value).decode("utf-8")
+            setattr(obj, self.slot, value)
+        return value
+
+    def __set__(self, obj, value):
+        if isinstance(value, str) and len(value) >= LAZY_TEXT_THRESHOLD:
+            value = zlib.compress(value.encode("utf-8"), 1)
+        setattr(obj, self.slot, value)
+
+
+class Model:
+    """Compact, attribute based alternative to the plain dicts returned by the api
+
+    Known fields are stored in __slots__, large text fields (see LazyText) are kept compressed until first
+    accessed, and unknown fields are kept in a separate dict so nothing is lost.  Models also support
+    `model["field"]`, `model.get("field")`, `"field" in model` and iterating over the keys so code written
+    against dicts keeps working.  A known field the api did not return reads as None as an attribute, but is
+    missing like a dict key.
+    """
+
+    __slots__ = ("_extra",)
+    fields = ()
+    lazy_fields = ()
+    nested = {}
+
+    def __init__(self, data):
+        data = dict(data)
+        for name in self.fields + self.lazy_fields:
+            if name in data:
+                value = data.pop(name)
+                if name in self.nested and isinstance(value, dict):
+                    value = self.nested[name](value)
+                setattr(self, name, value)
+        self._extra = data or None
+
+    def __getattr__(self, name):
+        # only called for unset slots and names that are not fields
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name in self.fields or name in self.lazy_fields:
+            return None
+        if self._extra and name in self._extra:
+            return self._extra[name]
+        raise AttributeError(name)
+
+    def __getitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self else default
+
+    def __contains__(self, key):
+        # a field is only present when the api returned it, like the key of a dict
+        if key in self.fields or key in self.lazy_fields:
+            slot = "_" + key if key in self.lazy_fields else key
+            try:
+                object.__getattribute__(self, slot)
+            except AttributeError:
+                return False
+            return True
+        return bool(self._extra) and key in self._extra
+
+    def keys(self):
+        """Names of the fields the api returned, as the keys of the dict would be"""
+        return [name for name, _ in self._items()] + list(self._extra or ())
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def _items(self):
+        for name in self.fields + self.lazy_fields:
+            slot = "_" + name if name in self.lazy_fields else name
+            try:
+                yield name, object.__getattribute__(self, slot)
+            except AttributeError:
+                pass
+
+    def to_dict(self):
+        """Convert back to the dict the api returned"""
+        data = {}
+        for name, value in self._items():
+            if name in self.lazy_fields:
+                value = getattr(self, name)
+            elif isinstance(value, Model):
+                value = value.to_dict()
+            data[name] = value
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def __eq__(self, other):
+        if isinstance(other, Model):
+            return type(self) is type(other) and self.to_dict() == other.to_dict()
+        return NotImplemented
+
+    def __repr__(self):
+        return "%s(id=%r)" % (type(self).__name__, getattr(self, "id", None))
+
+
+def model(name, fields, lazy_fields=(), nested=None):
+    """Create a Model subclass with slots for the given fields"""
+    namespace = {
+        "__slots__": tuple(fields) + tuple("_" + f for f in lazy_fields),
+        "fields": tuple(fields),
+        "lazy_fields": tuple(lazy_fields),
+        "nested": nested or {},
+    }
+    namespace.update((f, LazyText(f)) for f in lazy_fields)
+    return type(name, (Model,), namespace)
+
+
+User = model(
+    "User",
+    [
+        "type_of",
+        "id",
+        "username",
+        "name",
+        "summary",
+        "twitter_username",
+        "github_username",
+        "website_url",
+        "location",
+        "joined_at",
+        "profile_image",
+        "profile_image_90",
+    ],
+)
+
+Article = model(
+    "Article",
+    [
+        "type_of",
+        "id",
+        "title",
+        "description",
+        "cover_image",
+        "readable_publish_date",
+        "social_image",
+        "tag_list",
+        "tags",
+        "slug",
+        "path",
+        "url",
+        "canonical_url",
+        "comments_count",
+        "positive_reactions_count",
+        "public_reactions_count",
+        "page_views_count",
+        "collection_id",
+        "created_at",
+        "edited_at",
+        "crossposted_at",
+        "published",
+        "published_at",
+        "last_comment_at",
+        "published_timestamp",
+        "reading_time_minutes",
+        "user",
+        "organization",
+        "flare_tag",
+    ],
+    lazy_fields=["body_html", "body_markdown"],
+    nested={"user": User},
+)
+
+Tag = model("Tag", ["id", "name", "bg_color_hex", "text_color_hex"])
+
+Webhook = model(
+    "Webhook", ["type_of", "id", "source", "target_url", "events", "created_at", "user"], nested={"user": User}
+)
@@ -0,0 +1,117 @@
+import multiprocessing
+import os
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from pydevto.markdown_converter import _init_worker, html_to_markdown
+
+# Outcome of one article: error is the exception raised fetching or converting it, or None on success
+ArticleMarkdown = namedtuple("ArticleMarkdown", ["id", "markdown", "error"])
+
+# put on the results queue by the fetch thread, with the number of articles it submitted
+_DONE = object()
+
+
+def _convert_article(html, parser):
+    return html_to_markdown(html, parser)
+
+
+def _worker_context():
+    # Workers are forked on demand (python 3.9 and 3.10) while the fetch threads hold locks, so never fork this
+    # process: forkserver forks them from a clean single threaded server, spawn (eg. on Windows) starts them anew
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def public_articles_markdown(
+    api, ids, fetch_workers=None, convert_workers=None, queue_size=None, ordered=False, parser=None
+):
+    """Fetch public articles and convert their body_html to markdown, overlapping the two stages
+
+    Articles are fetched by a pool of threads (see PyDevTo.public_articles_by_id) and each one is handed to a
+    pool of worker processes as soon as it arrives, so the network and the cpus are kept busy at the same
+    time.  At most queue_size articles are held between fetching and the caller: when conversion or the
+    caller falls behind, fetching pauses until results are consumed.  A failed fetch or conversion is
+    reported in its ArticleMarkdown and does not stop the rest of the batch.
+
+    >>> for article in public_articles_markdown(api, ids, fetch_workers=8):
+    ...     save(article.id, article.markdown)
+
+    :param api: PyDevTo client used to fetch the articles
+    :param ids: iterable of article ids, consumed lazily
+    :param fetch_workers: number of concurrent fetches, defaults to the pool size of the client
+    :param convert_workers: number of worker processes converting html, defaults to the number of cpus
+    :param queue_size: maximum number of fetched articles not yet yielded, defaults to 4 per convert worker
+    :param ordered: True to yield results in the order of ids, otherwise they are yielded as they complete
+    :param parser: parser backend, see html_to_markdown
+    :return: iterator of ArticleMarkdown(id, markdown, error)
+    """
+    convert_workers = convert_workers or os.cpu_count() or 1
+    slots = threading.Semaphore(queue_size or convert_workers * 4)
+    stop = threading.Event()
+    # (id, future of the markdown), in the order of ids when ordered, otherwise as they complete
+    results = queue.Queue()
+    failure = []
+    # conversions not done yet, cancelled when the caller stops early
+    pending = set()
+
+    def fetch(executor):
+        submitted = 0
+        fetched = api.public_articles_by_id(ids, max_workers=fetch_workers, ordered=ordered)
+        try:
+            for result in fetched:
+                slots.acquire()
+                if stop.is_set():
+                    return
+                future = Future()
+                if result.error is not None:
+                    future.set_exception(result.error)
+                else:
+                    try:
+                        future = executor.submit(_convert_article, result.result["body_html"], parser)
+                    except Exception as e:
+                        future.set_exception(e)
+                    else:
+                        pending.add(future)
+                        future.add_done_callback(pending.discard)
+                if ordered:
+                    results.put((result.id, future))
+                else:
+                    future.add_done_callback(lambda future, id=result.id: results.put((id, future)))
+                submitted += 1
+        except BaseException as e:
+            failure.append(e)
+        finally:
+            fetched.close()
+            results.put((_DONE, submitted))
+
+    with ProcessPoolExecutor(
+        max_workers=convert_workers, mp_context=_worker_context(), initializer=_init_worker, initargs=(parser,)
+    ) as executor:
+        fetcher = threading.Thread(target=fetch, args=(executor,), daemon=True)
+        fetcher.start()
+        try:
+            received = 0
+            expected = None
+            while expected is None or received < expected:
+                id, future = results.get()
+                if id is _DONE:
+                    expected = future
+                    continue
+                received += 1
+                error = future.exception()
+                yield ArticleMarkdown(id, None if error else future.result(), error)
+                slots.release()
+            if failure:
+                raise failure[0]
+        finally:
+            stop.set()
+            slots.release()
+            fetcher.join()
+            # shutdown(cancel_futures=True) needs python 3.9
+            for future in list(pending):
+                future.cancel()
+            executor.shutdown()
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_EXTENSION = ".md"
+DEFAULT_MANIFEST = ".pydevto-manifest.json"
+DEFAULT_MAX_WORKERS = 4
+
+# create_article / update_article arguments that can be set from front matter
+ARTICLE_FIELDS = (
+    "title",
+    "published",
+    "series",
+    "main_image",
+    "canonical_url",
+    "description",
+    "tags",
+    "organization_id",
+)
+FIELD_ALIASES = {"cover_image": "main_image"}
+
+# Outcome for one file: action is "created", "updated", "unchanged" or "failed"
+PublishResult = namedtuple("PublishResult", ["path", "action", "id", "error"])
+
+
+def _parse_value(key, value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    if key == "tags":
+        return [tag.strip().strip("\"'") for tag in value.strip("[]").split(",") if tag.strip()]
+    if key == "organization_id" and value.isdigit():
+        return int(value)
+    return value
+
+
+def parse_front_matter(text):
+    """Split a markdown post into (front matter dict, body)
+
+    Only flat `key: value` front matter is supported, which covers the fields dev.to understands.
+    """
+    lines = text.splitlines(keepends=True)
+    if not lines or lines[0].strip() != "---":
+        return {}, text
+    for end in range(1, len(lines)):
+        if lines[end].strip() == "---":
+            break
+    else:
+        return {}, text
+    meta = {}
+    for line in lines[1:end]:
+        key, sep, value = line.partition(":")
+        if sep and key.strip():
+            key = key.strip()
+            meta[key] = _parse_value(key, value)
+    return meta, "".join(lines[end + 1:]).lstrip("\n")
+
+
+def article_from_file(path):
+    """Return the create_article / update_article keyword arguments for a markdown file"""
+    with open(path, encoding="utf-8") as f:
+        meta, body = parse_front_matter(f.read())
+    article = {"body_markdown": body}
+    for key, value in meta.items():
+        key = FIELD_ALIASES.get(key, key)
+        if key in ARTICLE_FIELDS:
+            article[key] = value
+    article.setdefault("title", os.path.splitext(os.path.basename(path))[0])
+    return article
+
+
+def content_hash(article):
+    return hashlib.sha256(json.dumps(article, sort_keys=True).encode()).hexdigest()
+
+
+class DirectoryPublisher:
+    """Publish a directory of markdown posts to dev.to, only sending the ones that changed
+
+    A manifest file maps each post (by path relative to the directory) to its article id and the hash of what
+    was last sent.  A run lists the user's articles once, to adopt existing articles by title and to recreate
+    ones deleted on dev.to, and then only creates or updates posts whose content hash changed.  Writes run
+    concurrently, pair this with a RateLimiter on the client to stay within the dev.to write limits.
+
+    >>> api = PyDevTo(api_key="MY_KEY", rate_limiter=RateLimiter())
+    >>> results = DirectoryPublisher(api, "posts/").publish()
+    """
+
+    def __init__(
+        self,
+        api,
+        directory,
+        manifest_path=None,
+        extension=DEFAULT_EXTENSION,
+        max_workers=DEFAULT_MAX_WORKERS,
+    ):
+        """
+
+        :param api: PyDevTo client
+        :param directory: directory with markdown posts, searched recursively
+        :param manifest_path: path of the manifest file, defaults to .pydevto-manifest.json in directory
+        :param extension: file extension of posts
+        :param max_workers: maximum number of concurrent writes
+        """
+        self.api = api
+        self.directory = directory
+        self.manifest_path = manifest_path or os.path.join(directory, DEFAULT_MANIFEST)
+        self.extension = extension
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+
+    def load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_manifest(self, manifest):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def files(self):
+        """Paths of all posts, relative to the directory"""
+        paths = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(self.extension):
+                    paths.append(os.path.relpath(os.path.join(root, name), self.directory))
+        return sorted(paths)
+
+    def publish(self, dry_run=False):
+        """Create or update every post that changed since the last run
+
+        :param dry_run: True to only report what would be sent
+        :return: list of PublishResult, one per post
+        """
+        manifest = self.load_manifest()
+        remote = {article["id"]: article for article in self.api.iter_articles(state="all", per_page=1000)}
+        ids_by_title = {article.get("title"): id for id, article in remote.items()}
+
+        results = []
+        changes = []
+        for path in self.files():
+            article = article_from_file(os.path.join(self.directory, path))
+            digest = content_hash(article)
+            entry = manifest.get(path)
+            id = entry["id"] if entry and entry["id"] in remote else ids_by_title.get(article["title"])
+            if entry and entry["id"] == id and entry["hash"] == digest:
+                results.append(PublishResult(path, "unchanged", id, None))
+            else:
+                changes.append((path, id, article, digest))
+
+        if dry_run:
+            return sorted(
+                results
+                + [PublishResult(path, "updated" if id else "created", id, None) for path, id, _, _ in changes]
+            )
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results.extend(executor.map(lambda change: self._write(manifest, *change), changes))
+        finally:
+            self.save_manifest(manifest)
+        return sorted(results)
+
+    def _write(self, manifest, path, id, article, digest):
+        try:
+            if id:
+                self.api.update_article(id, **article)
+                action = "updated"
+            else:
+                id = self.api.create_article(**article)["id"]
+                action = "created"
+        except Exception as e:
+            return PublishResult(path, "failed", id, e)
+        with self._lock:
+            manifest[path] = {"id": id, "hash": digest}
+        return PublishResult(path, action, id, None)
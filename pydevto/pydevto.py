@@ -1,17 +1,131 @@
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from pydevto.coalesce import SingleFlight, request_key
+from pydevto.metrics import RequestEvent
+from pydevto.models import Article, Tag, User, Webhook
+from pydevto.ratelimit import IDEMPOTENT_METHODS, backoff_delay, retry_after, should_retry
+
+API_URL = "https://dev.to/api"
+DEFAULT_TIMEOUT = 30
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_PREFETCH = 2
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_BACKOFF_MAX = 30
+
+# Outcome of one call in a bulk request: error is the exception raised for that id, or None on success
+BulkResult = namedtuple("BulkResult", ["id", "result", "error"])
+
+
+class PyDevToError(requests.HTTPError):
+    """Raised when the api answers with an error status, after any retries
+
+    `status_code` holds the http status and `body` the decoded json error (or the raw text if it is not json).
+    """
 
+    def __init__(self, status_code, body, url=None, response=None):
+        super().__init__(
+            "%s error for url %s: %s" % (status_code, url, body), response=response
+        )
+        self.status_code = status_code
+        self.body = body
+        self.url = url
 
-class PyDevTo:
-    def __init__(self, api_key=None, timeout=None):
+
+class BasePyDevTo:
+    """Endpoint definitions shared by PyDevTo and AsyncPyDevTo
+
+    Every endpoint returns whatever `_request` returns, a parsed json response for PyDevTo and a coroutine for
+    AsyncPyDevTo.
+    """
+
+    def __init__(
+        self,
+        api_key=None,
+        timeout=DEFAULT_TIMEOUT,
+        base_url=API_URL,
+        headers=None,
+        rate_limiter=None,
+        max_retries=DEFAULT_MAX_RETRIES,
+        backoff_factor=DEFAULT_BACKOFF_FACTOR,
+        backoff_max=DEFAULT_BACKOFF_MAX,
+        models=False,
+        observers=None,
+    ):
         """
 
         :param api_key:  Your dev.to api key (https://dev.to/settings/account)
-        :param timeout: Timeout period for http requests
+        :param timeout: Timeout period for http requests, used for every endpoint
+        :param base_url: Root url of the api, eg. to point the client at a local server
+        :param headers: Extra headers sent with every request
+        :param rate_limiter: (optional) pydevto.ratelimit.RateLimiter every request waits on
+        :param max_retries: Number of times to retry a request rejected with 429, or failed with a 5xx or
+            connection error when the method is idempotent
+        :param backoff_factor: Base delay in seconds of the jittered exponential backoff between retries, a
+            Retry-After header takes precedence
+        :param backoff_max: Maximum backoff delay in seconds
+        :param models: True to return pydevto.models objects (Article, User, Tag, Webhook) instead of dicts
+        :param observers: pydevto.metrics.RequestObserver instances called before and after every request
         """
         self.api_key = api_key
         self.timeout = timeout
-
-    def public_articles(self, page=None, tag=None, username=None, state=None, top=None):
+        self.base_url = base_url.rstrip("/")
+        self.headers = dict(headers or {})
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.models = models
+        self.observers = list(observers or [])
+
+    def default_headers(self):
+        """Headers sent with every request"""
+        headers = {}
+        if self.api_key:
+            headers["api-key"] = self.api_key
+        headers.update(self.headers)
+        return headers
+
+    def _retry_delay(self, method, attempt, headers=None):
+        """Seconds to wait before retry `attempt`, pausing the rate limiter when the server asked us to back off"""
+        delay = retry_after(headers) if headers is not None else None
+        if delay is None:
+            return backoff_delay(attempt, self.backoff_factor, self.backoff_max)
+        if self.rate_limiter is not None:
+            self.rate_limiter.pause(method, delay)
+            return 0
+        return delay
+
+    def _to_model(self, data, model):
+        """Convert a decoded response to model objects when the client was created with models=True"""
+        if not self.models or model is None:
+            return data
+        if isinstance(data, list):
+            return [model(item) for item in data]
+        return model(data)
+
+    def _notify(self, hook, event):
+        for observer in self.observers:
+            getattr(observer, hook)(event)
+
+    def _request(self, method, path, params=None, json=None, model=None):
+        raise NotImplementedError
+
+    def _iter_pages(self, fetch, per_page, prefetch):
+        raise NotImplementedError
+
+    def _map_concurrent(self, fn, ids, max_workers, ordered):
+        raise NotImplementedError
+
+    def public_articles(self, page=None, tag=None, username=None, state=None, top=None, per_page=None):
         """Return a list of public (published) articles
 
         :param page: pagination page
@@ -19,18 +133,47 @@ class PyDevTo:
         :param username: articles belonging to a User or Organization ordered by descending published_at
         :param state: "fresh" or "rising".  check which articles are fresh or rising.
         :param top: (int) most popular articles in the last N days
+        :param per_page: page size
         :return:
         """
-        return requests.get(
-            "https://dev.to/api/articles",
+        return self._request(
+            "GET",
+            "/articles",
             params={
                 "page": page,
                 "tag": tag,
                 "username": username,
                 "state": state,
                 "top": top,
+                "per_page": per_page,
             },
-        ).json()
+            model=Article,
+        )
+
+    def iter_public_articles(
+        self, tag=None, username=None, state=None, top=None, per_page=None, prefetch=DEFAULT_PREFETCH
+    ):
+        """Iterate over public (published) articles across all pages
+
+        Pages are fetched lazily, with the next `prefetch` pages requested in the background while the
+        current page is consumed.  Iteration stops at the first empty page, or the first page shorter than
+        per_page when it is given.
+
+        :param tag: articles that contain the requested tag.
+        :param username: articles belonging to a User or Organization ordered by descending published_at
+        :param state: "fresh" or "rising".  check which articles are fresh or rising.
+        :param top: (int) most popular articles in the last N days
+        :param per_page: page size
+        :param prefetch: number of pages to fetch ahead
+        :return: iterator of articles
+        """
+        return self._iter_pages(
+            lambda page: self.public_articles(
+                page=page, tag=tag, username=username, state=state, top=top, per_page=per_page
+            ),
+            per_page,
+            prefetch,
+        )
 
     def public_article(self, id):
         """Return a single public (published) article given its id
@@ -38,9 +181,20 @@ class PyDevTo:
         :param id: id of the article
         :return: article
         """
-        return requests.get(
-            "https://dev.to/api/articles/{id}".format(id=id), timeout=self.timeout
-        ).json()
+        return self._request("GET", "/articles/{id}".format(id=id), model=Article)
+
+    def public_articles_by_id(self, ids, max_workers=None, ordered=False):
+        """Fetch many public (published) articles concurrently
+
+        A failed fetch is reported in its BulkResult and does not stop the rest of the batch.  Ids are consumed
+        lazily, so at most a small multiple of max_workers fetches are queued at any time.
+
+        :param ids: iterable of article ids
+        :param max_workers: maximum number of concurrent requests, defaults to the size of the connection pool
+        :param ordered: True to yield results in the order of ids, otherwise they are yielded as they complete
+        :return: iterator of BulkResult(id, result, error)
+        """
+        return self._map_concurrent(self.public_article, ids, max_workers, ordered)
 
     def articles(self, page=None, per_page=None, state="published"):
         """Return a list of user articles
@@ -50,20 +204,29 @@ class PyDevTo:
         :param state: "published", "unpublished" or "all
         :return: list of articles
         """
-        url = "https://dev.to/api/articles/me"
+        url = "/articles/me"
         if state == "published":
-            url = "https://dev.to/api/articles/me"
+            url = "/articles/me"
         elif state == "unpublished":
-            url = "https://dev.to/api/articles/me/unpublished"
+            url = "/articles/me/unpublished"
         elif state == "all":
-            url = "https://dev.to/api/articles/me/all"
+            url = "/articles/me/all"
+
+        return self._request("GET", url, params={"page": page, "per_page": per_page}, model=Article)
 
-        return requests.get(
-            url,
-            params={"page": page, "per_page": per_page},
-            headers={"api-key": self.api_key},
-            timeout=self.timeout,
-        ).json()
+    def iter_articles(self, state="published", per_page=None, prefetch=DEFAULT_PREFETCH):
+        """Iterate over user articles across all pages, see iter_public_articles
+
+        :param state: "published", "unpublished" or "all
+        :param per_page: page size
+        :param prefetch: number of pages to fetch ahead
+        :return: iterator of articles
+        """
+        return self._iter_pages(
+            lambda page: self.articles(page=page, per_page=per_page, state=state),
+            per_page,
+            prefetch,
+        )
 
     def create_article(
         self,
@@ -90,7 +253,7 @@ class PyDevTo:
         :param organization_id: Organization id
         :return: newly created article
         """
-        url = "https://dev.to/api/articles"
+        url = "/articles"
 
         data = {
             "title": title,
@@ -106,9 +269,7 @@ class PyDevTo:
         # remove None keys from dict
         data = {k: v for k, v in data.items() if v is not None}
 
-        return requests.post(
-            url, json=data, headers={"api-key": self.api_key}, timeout=self.timeout
-        ).json()
+        return self._request("POST", url, json=data, model=Article)
 
     def update_article(
         self,
@@ -137,7 +298,7 @@ class PyDevTo:
         :param organization_id: Organization id
         :return: updated article
         """
-        url = "https://dev.to/api/articles/{id}".format(id=id)
+        url = "/articles/{id}".format(id=id)
 
         data = {
             "title": title,
@@ -153,9 +314,7 @@ class PyDevTo:
         # remove None keys from dict
         data = {k: v for k, v in data.items() if v is not None}
 
-        return requests.put(
-            url, json=data, headers={"api-key": self.api_key}, timeout=self.timeout
-        ).json()
+        return self._request("PUT", url, json=data, model=Article)
 
     def user(self, id=None, username=None):
         """Return user information
@@ -166,18 +325,13 @@ class PyDevTo:
         :param username: (optional) username of user
         :return: user object
         """
-        url = "https://dev.to/api/users/me"
+        url = "/users/me"
         if id:
-            url = "https://dev.to/api/users/{id}".format(id=id)
+            url = "/users/{id}".format(id=id)
         elif username:
-            url = "https://dev.to/api/users/by_username"
+            url = "/users/by_username"
 
-        return requests.get(
-            url,
-            params={"url": username},
-            headers={"api-key": self.api_key},
-            timeout=self.timeout,
-        ).json()
+        return self._request("GET", url, params={"url": username}, model=User)
 
     def follow_suggestions(self, page=None):
         """Return list of follow suggestions
@@ -185,36 +339,46 @@ class PyDevTo:
         :param page: pagination page
         :return: list of follow suggestions
         """
-        return requests.get(
-            "https://dev.to/api/users/?state=follow_suggestions",
-            params={"page": page},
-            headers={"api-key": self.api_key},
-            timeout=self.timeout,
-        ).json()
-
-    def tags(self, page=None):
+        return self._request(
+            "GET", "/users", params={"state": "follow_suggestions", "page": page}, model=User
+        )
+
+    def iter_follow_suggestions(self, prefetch=DEFAULT_PREFETCH):
+        """Iterate over follow suggestions across all pages, see iter_public_articles
+
+        :param prefetch: number of pages to fetch ahead
+        :return: iterator of follow suggestions
+        """
+        return self._iter_pages(
+            lambda page: self.follow_suggestions(page=page), None, prefetch
+        )
+
+    def tags(self, page=None, per_page=None):
         """Return list of tags
 
         :param page: pagination page
+        :param per_page: page size
         :return:
         """
-        return requests.get(
-            "https://dev.to/api/tags",
-            params={"page": page},
-            headers={"api-key": self.api_key},
-            timeout=self.timeout,
-        ).json()
+        return self._request("GET", "/tags", params={"page": page, "per_page": per_page}, model=Tag)
+
+    def iter_tags(self, per_page=None, prefetch=DEFAULT_PREFETCH):
+        """Iterate over tags across all pages, see iter_public_articles
+
+        :param per_page: page size
+        :param prefetch: number of pages to fetch ahead
+        :return: iterator of tags
+        """
+        return self._iter_pages(
+            lambda page: self.tags(page=page, per_page=per_page), per_page, prefetch
+        )
 
     def webhooks(self):
         """Return list of webhooks
 
         :return: list of webhooks
         """
-        return requests.get(
-            "https://dev.to/api/webhooks",
-            headers={"api-key": self.api_key},
-            timeout=self.timeout,
-        ).json()
+        return self._request("GET", "/webhooks", model=Webhook)
 
     def webhook(self, id):
         """Return single webhook with id
@@ -222,11 +386,7 @@ class PyDevTo:
         :param id: id of webhook
         :return: webhook object
         """
-        return requests.get(
-            "https://dev.to/api/webhooks/{id}".format(id=id),
-            headers={"api-key": self.api_key},
-            timeout=self.timeout,
-        ).json()
+        return self._request("GET", "/webhooks/{id}".format(id=id), model=Webhook)
 
     def create_webhook(self, source, target_url, events):
         """Create a new webhook
@@ -236,12 +396,12 @@ class PyDevTo:
         :param events: List of event identifiers
         :return:
         """
-        return requests.post(
-            "https://dev.to/api/webhooks",
-            headers={"api-key": self.api_key},
+        return self._request(
+            "POST",
+            "/webhooks",
             json={"source": source, "target_url": target_url, "events": events},
-            timeout=self.timeout,
-        ).json()
+            model=Webhook,
+        )
 
     def delete_webhook(self, id):
         """Delete  a webhook with id
@@ -249,8 +409,243 @@ class PyDevTo:
         :param id: id of webhook
         :return:
         """
-        return requests.delete(
-            "https://dev.to/api/webhooks/{id}".format(id=id),
-            headers={"api-key": self.api_key},
-            timeout=self.timeout,
-        ).json()
+        return self._request("DELETE", "/webhooks/{id}".format(id=id), model=Webhook)
+
+
+class PyDevTo(BasePyDevTo):
+    def __init__(
+        self,
+        api_key=None,
+        timeout=DEFAULT_TIMEOUT,
+        base_url=API_URL,
+        pool_connections=DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        pool_block=False,
+        keep_alive=True,
+        headers=None,
+        session=None,
+        cache=None,
+        rate_limiter=None,
+        max_retries=DEFAULT_MAX_RETRIES,
+        backoff_factor=DEFAULT_BACKOFF_FACTOR,
+        backoff_max=DEFAULT_BACKOFF_MAX,
+        models=False,
+        observers=None,
+        coalesce=False,
+    ):
+        """
+
+        :param api_key:  Your dev.to api key (https://dev.to/settings/account)
+        :param timeout: Timeout period for http requests, used for every endpoint
+        :param base_url: Root url of the api, eg. to point the client at a local server
+        :param pool_connections: Number of connection pools (one per host) to cache
+        :param pool_maxsize: Maximum number of connections kept alive per host, set this to the number of
+            threads sharing the client
+        :param pool_block: True to wait for a free connection when the pool is exhausted instead of
+            opening a throwaway one
+        :param keep_alive: False to close the connection after every request
+        :param headers: Extra headers sent with every request
+        :param session: (optional) requests.Session to use instead of creating one.  The api key and headers
+            are sent with each request instead of being set on it, and close() leaves it open
+        :param cache: (optional) pydevto.cache.ResponseCache to cache GET responses in
+        :param rate_limiter: (optional) pydevto.ratelimit.RateLimiter every request waits on
+        :param max_retries: Number of times to retry a request rejected with 429, or failed with a 5xx or
+            connection error when the method is idempotent
+        :param backoff_factor: Base delay in seconds of the jittered exponential backoff between retries
+        :param backoff_max: Maximum backoff delay in seconds
+        :param models: True to return pydevto.models objects (Article, User, Tag, Webhook) instead of dicts
+        :param observers: pydevto.metrics.RequestObserver instances called before and after every request
+        :param coalesce: True to share the response of a GET among concurrent identical calls, see
+            pydevto.coalesce
+        """
+        super().__init__(
+            api_key=api_key,
+            timeout=timeout,
+            base_url=base_url,
+            headers=headers,
+            rate_limiter=rate_limiter,
+            max_retries=max_retries,
+            backoff_factor=backoff_factor,
+            backoff_max=backoff_max,
+            models=models,
+            observers=observers,
+        )
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self._session = session
+        self._owns_session = session is None
+        self._session_lock = threading.Lock()
+        self.cache = cache
+        self.coalescer = SingleFlight() if coalesce else None
+
+    @property
+    def session(self):
+        """The pooled requests.Session shared by all calls on this client, created on first use"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def _create_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(self.default_headers())
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def close(self):
+        """Close the session and release all pooled connections, a session passed in is left to its owner"""
+        with self._session_lock:
+            if self._owns_session and self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _request(self, method, path, params=None, json=None, model=None):
+        if self.coalescer is not None and method == "GET":
+            key = request_key(method, self.base_url + path, params, self.api_key)
+            return self.coalescer.do(key, lambda: self._observed_request(method, path, params, json, model))
+        return self._observed_request(method, path, params, json, model)
+
+    def _observed_request(self, method, path, params, json, model):
+        event = RequestEvent(method, path)
+        self._notify("before_request", event)
+        try:
+            return self._call(method, path, params, json, model, event)
+        except Exception as e:
+            event.error = e
+            raise
+        finally:
+            event.finish()
+            self._notify("after_request", event)
+
+    def _call(self, method, path, params, json, model, event):
+        url = self.base_url + path
+        cache_key = entry = headers = None
+        if self.cache is not None and method == "GET":
+            cache_key = self.cache.key(method, url, params, self.api_key)
+            entry, fresh = self.cache.lookup(cache_key)
+            if fresh:
+                event.cache = "hit"
+                return self._to_model(entry.data, model)
+            if entry is not None:
+                headers = entry.validators()
+        if not self._owns_session:
+            # a session passed in does not carry the api key and default headers, see _create_session
+            headers = {**self.default_headers(), **(headers or {})}
+            if not self.keep_alive:
+                headers["Connection"] = "close"
+
+        response = self._send(method, url, params, json, headers, event)
+        event.status_code = response.status_code
+        event.bytes_sent = len(response.request.body or b"")
+        event.bytes_received = len(response.content)
+        if entry is not None and response.status_code == 304:
+            event.cache = "revalidated"
+            self.cache.revalidated(cache_key, entry)
+            return self._to_model(entry.data, model)
+        if not response.ok:
+            try:
+                body = response.json()
+            except ValueError:
+                body = response.text
+            raise PyDevToError(response.status_code, body, url=url, response=response)
+
+        started = time.perf_counter()
+        data = response.json()
+        event.decode_time = time.perf_counter() - started
+        if cache_key is not None:
+            self.cache.store(
+                cache_key,
+                data,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        return self._to_model(data, model)
+
+    def _send(self, method, url, params, json, headers, event):
+        attempt = 0
+        while True:
+            event.retries = attempt
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(method)
+            try:
+                response = self.session.request(
+                    method,
+                    url,
+                    params=params,
+                    json=json,
+                    headers=headers,
+                    timeout=self.timeout,
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                if method not in IDEMPOTENT_METHODS or attempt >= self.max_retries:
+                    raise
+                time.sleep(self._retry_delay(method, attempt))
+            else:
+                if attempt >= self.max_retries or not should_retry(method, response.status_code):
+                    return response
+                delay = self._retry_delay(method, attempt, response.headers)
+                response.close()
+                time.sleep(delay)
+            attempt += 1
+
+    def _iter_pages(self, fetch, per_page, prefetch):
+        # At most prefetch + 1 pages are held at any time: the one being consumed and those in flight
+        pending = deque()
+        page = 1
+        with ThreadPoolExecutor(max_workers=prefetch + 1) as executor:
+            try:
+                while True:
+                    while len(pending) <= prefetch:
+                        pending.append(executor.submit(fetch, page))
+                        page += 1
+                    items = pending.popleft().result()
+                    if not items:
+                        return
+                    yield from items
+                    if per_page and len(items) < per_page:
+                        return
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _map_concurrent(self, fn, ids, max_workers, ordered):
+        max_workers = max_workers or self.pool_maxsize
+        ids = iter(ids)
+        window = max_workers * 2
+        # future -> id, in submission order
+        pending = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                while True:
+                    for id in islice(ids, window - len(pending)):
+                        pending[executor.submit(fn, id)] = id
+                    if not pending:
+                        return
+                    if ordered:
+                        done = [next(iter(pending))]
+                    else:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        id = pending.pop(future)
+                        error = future.exception()
+                        yield BulkResult(id, None if error else future.result(), error)
+            finally:
+                for future in pending:
+                    future.cancel()
@@ -0,0 +1,114 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# dev.to does not publish exact numbers for every endpoint, these stay below the documented write limit of
+# 10 requests per 30 seconds and keep reads at a modest pace.  Tune them to the limits of your api key.
+DEFAULT_READ_RATE = 3
+DEFAULT_READ_BURST = 10
+DEFAULT_WRITE_RATE = 10 / 30
+DEFAULT_WRITE_BURST = 3
+
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+
+
+class TokenBucket:
+    """Thread safe token bucket allowing `rate` calls per second on average and bursts of up to `burst` calls"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        if now > self._stamp:
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+
+    def reserve(self):
+        """Take a token and return the number of seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            return max(0, self._stamp - now) + max(0, -self._tokens) / self.rate
+
+    def acquire(self):
+        """Block until a token is available"""
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    def pause(self, seconds):
+        """Hand out no tokens for the next `seconds`, eg. after the server answered with Retry-After"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # allow a single request once the pause is over, then pace the rest
+            self._tokens = min(self._tokens, 1)
+            self._stamp = max(self._stamp, now + seconds)
+
+
+class RateLimiter:
+    """Separate token buckets for read (GET) and write requests, shared by all threads using the client
+
+    >>> api = PyDevTo(api_key="MY_KEY", rate_limiter=RateLimiter(read_rate=5, write_rate=0.3))
+    """
+
+    def __init__(
+        self,
+        read_rate=DEFAULT_READ_RATE,
+        write_rate=DEFAULT_WRITE_RATE,
+        read_burst=DEFAULT_READ_BURST,
+        write_burst=DEFAULT_WRITE_BURST,
+    ):
+        """
+
+        :param read_rate: GET requests per second
+        :param write_rate: POST, PUT and DELETE requests per second
+        :param read_burst: number of GET requests allowed back to back
+        :param write_burst: number of write requests allowed back to back
+        """
+        self.read = TokenBucket(read_rate, read_burst)
+        self.write = TokenBucket(write_rate, write_burst)
+
+    def bucket(self, method):
+        return self.read if method == "GET" else self.write
+
+    def reserve(self, method):
+        return self.bucket(method).reserve()
+
+    def acquire(self, method):
+        return self.bucket(method).acquire()
+
+    def pause(self, method, seconds):
+        self.bucket(method).pause(seconds)
+
+
+def should_retry(method, status_code):
+    """429 means the request was not processed so it is always safe to retry, 5xx only for idempotent methods"""
+    return status_code == 429 or (status_code >= 500 and method in IDEMPOTENT_METHODS)
+
+
+def retry_after(headers):
+    """Seconds to wait according to the Retry-After header, or None"""
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, factor, maximum):
+    """Exponential backoff with full jitter for the given (0 based) retry attempt"""
+    return random.uniform(0, min(maximum, factor * 2 ** attempt))
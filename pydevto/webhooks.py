@@ -0,0 +1,315 @@
+import asyncio
+import hashlib
+import inspect
+import json
+import time
+from collections import OrderedDict, namedtuple
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_BATCH_TIMEOUT = 1.0
+DEFAULT_MAX_PENDING = 10000
+DEFAULT_ENQUEUE_TIMEOUT = 5.0
+DEFAULT_RETRY_AFTER = 5
+DEFAULT_DEDUPE_SIZE = 100000
+DEFAULT_MAX_BODY_SIZE = 1024 * 1024
+DEFAULT_ID_HEADER = "X-Event-Id"
+MAX_HEADER_SIZE = 64 * 1024
+
+# A received webhook event: id is the id_header of the delivery, or a hash of the body when it has none, type
+# the event identifier (eg. "article_created") and data the decoded payload
+WebhookEvent = namedtuple("WebhookEvent", ["id", "type", "data"])
+
+REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    503: "Service Unavailable",
+}
+
+
+class InvalidPayload(ValueError):
+    pass
+
+
+def parse_event(body, headers, id_header=DEFAULT_ID_HEADER):
+    """Validate a webhook delivery and return its WebhookEvent
+
+    The body must be a json object of the form {"data": {"type": "article_created", "attributes": {...}}}.
+
+    :param body: request body, bytes
+    :param headers: dict of request headers with lower case names
+    :param id_header: header holding the id of the event, redeliveries of an event carry the same id
+    :raises InvalidPayload: when the body is not a valid event
+    """
+    try:
+        payload = json.loads(body)
+    except ValueError as e:
+        raise InvalidPayload("body is not json: %s" % e)
+    if not isinstance(payload, dict) or not isinstance(payload.get("data"), dict):
+        raise InvalidPayload("payload has no data object")
+    event_type = payload["data"].get("type")
+    if not isinstance(event_type, str) or not event_type:
+        raise InvalidPayload("data has no type")
+    if not isinstance(payload["data"].get("attributes", {}), dict):
+        raise InvalidPayload("data attributes is not an object")
+    event_id = headers.get(id_header.lower()) or hashlib.sha256(body).hexdigest()
+    return WebhookEvent(event_id, event_type, payload)
+
+
+class _SeenIds:
+    """The most recent maxsize event ids"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._ids = OrderedDict()
+
+    def __contains__(self, event_id):
+        return event_id in self._ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, event_id):
+        self._ids[event_id] = None
+        if len(self._ids) > self.maxsize:
+            self._ids.popitem(last=False)
+
+
+class WebhookReceiver:
+    """asyncio http server receiving the events of webhooks registered with PyDevTo.create_webhook
+
+    Deliveries are validated (see parse_event), redeliveries of an event already accepted are acknowledged but
+    dropped, and accepted events are handed to callback in batches of up to batch_size events, or fewer once
+    the oldest event of a batch has waited batch_timeout seconds.  callback is called with a list of
+    WebhookEvent, one batch at a time, and may be a coroutine function; a plain function is run in the default
+    executor so it does not block the server.
+
+    Events are acknowledged (202) once queued.  At most max_pending events are queued: when callback falls
+    behind, deliveries wait up to enqueue_timeout seconds for room and are then refused with a 503 and a
+    Retry-After header, so the sender retries later instead of the queue growing without bound.
+
+    >>> async def store(events):
+    ...     await db.insert_many([event.data for event in events])
+    >>> async with WebhookReceiver(store, port=8000) as receiver:
+    ...     await receiver.serve_forever()
+    """
+
+    def __init__(
+        self,
+        callback,
+        host="127.0.0.1",
+        port=8000,
+        path="/",
+        batch_size=DEFAULT_BATCH_SIZE,
+        batch_timeout=DEFAULT_BATCH_TIMEOUT,
+        max_pending=DEFAULT_MAX_PENDING,
+        enqueue_timeout=DEFAULT_ENQUEUE_TIMEOUT,
+        retry_after=DEFAULT_RETRY_AFTER,
+        dedupe_size=DEFAULT_DEDUPE_SIZE,
+        max_body_size=DEFAULT_MAX_BODY_SIZE,
+        id_header=DEFAULT_ID_HEADER,
+        event_types=None,
+    ):
+        """
+
+        :param callback: function or coroutine function called with each batch, a list of WebhookEvent
+        :param host: interface to listen on
+        :param port: port to listen on, 0 to pick a free one (see the port attribute once started)
+        :param path: url path deliveries are posted to
+        :param batch_size: maximum number of events per batch
+        :param batch_timeout: seconds an event may wait for its batch to fill up
+        :param max_pending: maximum number of accepted events waiting for callback
+        :param enqueue_timeout: seconds a delivery waits for room in the queue before it is refused
+        :param retry_after: seconds sent in the Retry-After header of refused deliveries
+        :param dedupe_size: number of recent event ids remembered to drop redeliveries
+        :param max_body_size: largest accepted body in bytes
+        :param id_header: header holding the id of the event
+        :param event_types: event types to accept, eg. ["article_created"], others are refused; None for all
+        """
+        self.callback = callback
+        self.host = host
+        self.port = port
+        self.path = path
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.max_pending = max_pending
+        self.enqueue_timeout = enqueue_timeout
+        self.retry_after = retry_after
+        self.max_body_size = max_body_size
+        self.id_header = id_header
+        self.event_types = set(event_types) if event_types is not None else None
+        self.last_error = None
+        self._seen = _SeenIds(dedupe_size)
+        # ids of events waiting for room in the queue
+        self._waiting = set()
+        self._queue = None
+        self._server = None
+        self._batcher = None
+        self._connections = set()
+        self._stats = dict.fromkeys(
+            ["received", "accepted", "duplicates", "invalid", "refused", "batches", "delivered", "callback_errors"],
+            0,
+        )
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        """Start listening and delivering batches"""
+        self._queue = asyncio.Queue(self.max_pending)
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port, limit=MAX_HEADER_SIZE
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._batcher = asyncio.ensure_future(self._deliver())
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self):
+        """Stop accepting deliveries and hand the events already accepted to callback"""
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._connections):
+            writer.close()
+        await self._server.wait_closed()
+        await self._queue.put(None)
+        await self._batcher
+        self._server = None
+
+    def stats(self):
+        """Counts of deliveries received, accepted, dropped as duplicates, invalid and refused because the queue
+        was full, of batches and events delivered to callback and of callback errors, and the number of events
+        pending"""
+        return dict(self._stats, pending=self._queue.qsize() if self._queue is not None else 0)
+
+    async def _handle_connection(self, reader, writer):
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ")
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "bad request line"}, keep_alive=False)
+                    return
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                length = headers.get("content-length")
+                if length is None or not length.isdigit():
+                    status, body, response_headers, keep_alive = 411, {"error": "content-length required"}, {}, False
+                elif int(length) > self.max_body_size:
+                    status, body, response_headers, keep_alive = 413, {"error": "body too large"}, {}, False
+                else:
+                    try:
+                        data = await reader.readexactly(int(length))
+                    except (asyncio.IncompleteReadError, ConnectionError):
+                        return
+                    status, body, response_headers = await self._handle_request(method, target, headers, data)
+                await self._respond(writer, status, body, keep_alive, response_headers)
+                if not keep_alive:
+                    return
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _handle_request(self, method, target, headers, data):
+        # -> (status, json body, response headers)
+        if target.split("?", 1)[0] != self.path:
+            return 404, {"error": "not found"}, {}
+        if method != "POST":
+            return 405, {"error": "method not allowed"}, {"Allow": "POST"}
+        self._stats["received"] += 1
+        try:
+            event = parse_event(data, headers, self.id_header)
+            if self.event_types is not None and event.type not in self.event_types:
+                raise InvalidPayload("unexpected event type %s" % event.type)
+        except InvalidPayload as e:
+            self._stats["invalid"] += 1
+            return 400, {"error": str(e)}, {}
+        if event.id in self._seen:
+            self._stats["duplicates"] += 1
+            return 200, {"status": "duplicate"}, {}
+        refused = 503, {"error": "too many pending events"}, {"Retry-After": str(self.retry_after)}
+        if event.id in self._waiting:
+            # a delivery of the same event is waiting for room and may still be refused
+            self._stats["refused"] += 1
+            return refused
+        self._waiting.add(event.id)
+        try:
+            await asyncio.wait_for(self._queue.put(event), self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self._stats["refused"] += 1
+            return refused
+        finally:
+            self._waiting.discard(event.id)
+        self._seen.add(event.id)
+        self._stats["accepted"] += 1
+        return 202, {"status": "accepted"}, {}
+
+    async def _respond(self, writer, status, body, keep_alive, headers=None):
+        data = json.dumps(body).encode()
+        head = [
+            "HTTP/1.1 %s %s" % (status, REASONS[status]),
+            "Content-Type: application/json",
+            "Content-Length: %s" % len(data),
+            "Connection: %s" % ("keep-alive" if keep_alive else "close"),
+        ]
+        head.extend("%s: %s" % item for item in (headers or {}).items())
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _deliver(self):
+        loop = asyncio.get_event_loop()
+        closed = False
+        while not closed:
+            event = await self._queue.get()
+            if event is None:
+                return
+            batch = [event]
+            deadline = time.monotonic() + self.batch_timeout
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    event = self._queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(
+                        self._queue.get(), timeout
+                    )
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if event is None:
+                    closed = True
+                    break
+                batch.append(event)
+            try:
+                if inspect.iscoroutinefunction(self.callback):
+                    await self.callback(batch)
+                else:
+                    await loop.run_in_executor(None, self.callback, batch)
+            except Exception as e:
+                self._stats["callback_errors"] += 1
+                self.last_error = e
+            self._stats["batches"] += 1
+            self._stats["delivered"] += len(batch)
@@ -0,0 +1,368 @@
+"""In-memory stand-in for the dev.to api, to test and load test the clients offline
+
+    python -m tests.fake_devto --port 3000 --articles 1000 --latency 0.05 --rate-limit 30 --error-rate 0.01
+
+then point a client at it with PyDevTo(base_url="http://127.0.0.1:3000/api").
+"""
+import argparse
+import math
+import random
+import re
+import threading
+import time
+
+from tests.stub_server import StubServer
+
+DEFAULT_PER_PAGE = 30
+MAX_PER_PAGE = 1000
+
+WORDS = "the quick brown fox jumps over lazy dog python markdown article api server client".split()
+
+
+class _Bucket:
+    """Token bucket that refuses instead of waiting: take() returns 0, or the seconds until a token is free"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+
+def body_html(rng, size):
+    """Html of about size characters with the markup articles usually have"""
+    parts = []
+    length = 0
+    while length < size:
+        words = " ".join(rng.choice(WORDS) for _ in range(12))
+        kind = len(parts) % 6
+        if kind == 0:
+            part = "<h2>%s</h2>" % words.title()
+        elif kind == 3:
+            part = "<ul><li>%s</li><li><code>%s()</code></li></ul>" % (words, rng.choice(WORDS))
+        elif kind == 5:
+            part = '<pre><code>def %s():\n    return "%s"\n</code></pre>' % (rng.choice(WORDS), words)
+        else:
+            part = '<p>%s <b>%s</b> <a href="https://example.com/%s">link</a></p>' % (words, words, len(parts))
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)
+
+
+class FakeDevTo(StubServer):
+    """Threaded http server implementing the dev.to endpoints used by PyDevTo over generated data
+
+    Articles, users and tags are generated from seed, articles, webhooks created through the api are kept in
+    memory.  Lists are newest first and paginated with page and per_page like dev.to, /articles filters on tag
+    and username.  Endpoints under /articles/me, writes and webhooks require an api-key header (any value).
+
+    Every request first waits latency seconds (plus up to jitter), is then refused with a 429 and Retry-After
+    when over rate_limit requests per second, or fails with error_status for a fraction error_rate of requests.
+    `stats` counts responses by status.
+
+    >>> with FakeDevTo(articles=500, latency=0.02) as server:
+    ...     api = PyDevTo(base_url=server.url)
+    ...     articles = list(api.iter_public_articles(per_page=100))
+    """
+
+    def __init__(
+        self,
+        articles=100,
+        users=10,
+        tags=20,
+        body_size=2000,
+        latency=0,
+        jitter=0,
+        rate_limit=None,
+        burst=10,
+        error_rate=0,
+        error_status=503,
+        seed=0,
+        port=0,
+        record=False,
+    ):
+        """
+
+        :param articles: number of generated articles, one in five is unpublished
+        :param users: number of generated users, the author of the api key is user 1
+        :param tags: number of generated tags
+        :param body_size: approximate size in characters of the body_html of each article
+        :param latency: seconds every request takes
+        :param jitter: up to this many seconds are added to latency at random
+        :param rate_limit: requests per second allowed, None for no limit
+        :param burst: number of requests allowed back to back under rate_limit
+        :param error_rate: fraction of requests that fail with error_status
+        :param error_status: status of injected errors
+        :param seed: seed of the generated data and of the injected latency and errors
+        :param port: port to listen on, 0 for a free one
+        :param record: True to record every request in `requests`, like StubServer
+        """
+        super().__init__(port=port, record=record)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.bucket = _Bucket(rate_limit, burst) if rate_limit else None
+        self.stats = {}
+        self._random = random.Random(seed)
+        rng = random.Random(seed)
+        self.users = [self._user(id) for id in range(1, users + 1)]
+        self.tags = [
+            {
+                "id": id,
+                "name": "tag%d" % id,
+                "bg_color_hex": "#%06x" % rng.randrange(1 << 24),
+                "text_color_hex": "#ffffff",
+            }
+            for id in range(1, tags + 1)
+        ]
+        # newest first
+        self.articles = [self._article(rng, id, body_size) for id in range(articles, 0, -1)]
+        self.articles_by_id = {article["id"]: article for article in self.articles}
+        self.webhooks = {}
+        self._next_id = articles + 1
+        self._handlers = [
+            ("GET", re.compile(r"/articles"), self.public_articles),
+            ("GET", re.compile(r"/articles/me(?:/(published|unpublished|all))?"), self.my_articles),
+            ("GET", re.compile(r"/articles/(\d+)"), self.article),
+            ("POST", re.compile(r"/articles"), self.create_article),
+            ("PUT", re.compile(r"/articles/(\d+)"), self.update_article),
+            ("GET", re.compile(r"/users/me"), lambda request: self.users[0]),
+            ("GET", re.compile(r"/users/by_username"), self.user_by_username),
+            ("GET", re.compile(r"/users/(\d+)"), self.user),
+            ("GET", re.compile(r"/users"), self.follow_suggestions),
+            ("GET", re.compile(r"/tags"), lambda request: self._page(self.tags, request)),
+            ("GET", re.compile(r"/webhooks"), lambda request: list(self.webhooks.values())),
+            ("POST", re.compile(r"/webhooks"), self.create_webhook),
+            ("GET", re.compile(r"/webhooks/(\d+)"), self.webhook),
+            ("DELETE", re.compile(r"/webhooks/(\d+)"), self.delete_webhook),
+        ]
+
+    def _user(self, id):
+        return {
+            "type_of": "user",
+            "id": id,
+            "username": "user%d" % id,
+            "name": "User %d" % id,
+            "summary": "Writes about things",
+            "twitter_username": None,
+            "github_username": "user%d" % id,
+            "website_url": None,
+            "location": None,
+            "joined_at": "Jan 1, 2019",
+            "profile_image": "https://example.com/user%d.png" % id,
+            "profile_image_90": "https://example.com/user%d_90.png" % id,
+        }
+
+    def _article(self, rng, id, body_size):
+        user = self.users[(id - 1) % len(self.users)]
+        tag_list = [tag["name"] for tag in rng.sample(self.tags, min(4, len(self.tags)))]
+        published = id % 5 != 0
+        timestamp = "2019-01-01T00:%02d:%02dZ" % (id // 60 % 60, id % 60)
+        html = body_html(rng, body_size)
+        return {
+            "type_of": "article",
+            "id": id,
+            "title": "Article %d" % id,
+            "description": "Description of article %d" % id,
+            "slug": "article-%d" % id,
+            "path": "/%s/article-%d" % (user["username"], id),
+            "url": "https://dev.to/%s/article-%d" % (user["username"], id),
+            "tag_list": tag_list,
+            "tags": ", ".join(tag_list),
+            "comments_count": id % 7,
+            "positive_reactions_count": id % 11,
+            "published": published,
+            "published_at": timestamp if published else None,
+            "edited_at": None,
+            "reading_time_minutes": 1 + len(html) // 1500,
+            "user": user,
+            "body_html": html,
+            "body_markdown": html,
+        }
+
+    def find_route(self, method, path):
+        for handler_method, pattern, handler in self._handlers:
+            match = pattern.fullmatch(path) if handler_method == method else None
+            if match:
+                return lambda request: self._serve(request, handler, match.groups())
+        return lambda request: self._serve(request, None, ())
+
+    def _serve(self, request, handler, args):
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        wait = self.bucket.take() if self.bucket is not None else 0
+        if wait:
+            result = (429, {"Retry-After": str(math.ceil(wait))}, {"error": "Rate limit reached", "status": 429})
+        elif fail:
+            result = (self.error_status, {}, {"error": "Injected error", "status": self.error_status})
+        elif handler is None:
+            result = (404, {}, {"error": "not found", "status": 404})
+        elif self._needs_key(request) and not request["headers"].get("api-key"):
+            result = (401, {}, {"error": "unauthorized", "status": 401})
+        else:
+            result = handler(request, *args)
+        status = result[0] if isinstance(result, tuple) else 200
+        with self._lock:
+            self.stats[status] = self.stats.get(status, 0) + 1
+        return result
+
+    @staticmethod
+    def _needs_key(request):
+        return (
+            request["method"] != "GET"
+            or request["path"].startswith("/articles/me")
+            or request["path"].startswith("/webhooks")
+            or request["path"] == "/users/me"
+        )
+
+    @staticmethod
+    def _page(items, request):
+        params = request["params"]
+        page = max(1, int(params.get("page") or 1))
+        per_page = min(MAX_PER_PAGE, max(1, int(params.get("per_page") or DEFAULT_PER_PAGE)))
+        return items[(page - 1) * per_page : page * per_page]
+
+    @staticmethod
+    def _summary(article):
+        # lists leave out the bodies, like dev.to
+        return {k: v for k, v in article.items() if k not in ("body_html", "body_markdown")}
+
+    @staticmethod
+    def _not_found():
+        return (404, {}, {"error": "not found", "status": 404})
+
+    def public_articles(self, request):
+        params = request["params"]
+        articles = [article for article in self.articles if article["published"]]
+        if params.get("tag"):
+            articles = [article for article in articles if params["tag"] in article["tag_list"]]
+        if params.get("username"):
+            articles = [article for article in articles if article["user"]["username"] == params["username"]]
+        return [self._summary(article) for article in self._page(articles, request)]
+
+    def my_articles(self, request, state=None):
+        mine = [article for article in self.articles if article["user"]["id"] == self.users[0]["id"]]
+        if state in (None, "published"):
+            mine = [article for article in mine if article["published"]]
+        elif state == "unpublished":
+            mine = [article for article in mine if not article["published"]]
+        page = self._page(mine, request)
+        return [dict(self._summary(article), body_markdown=article["body_markdown"]) for article in page]
+
+    def article(self, request, id):
+        article = self.articles_by_id.get(int(id))
+        if article is None or not article["published"]:
+            return self._not_found()
+        return article
+
+    def create_article(self, request):
+        data = request["json"] or {}
+        with self._lock:
+            id = self._next_id
+            self._next_id += 1
+            published = bool(data.get("published"))
+            article = {
+                "type_of": "article",
+                "id": id,
+                "title": data.get("title", ""),
+                "description": data.get("description", ""),
+                "tag_list": list(data.get("tags") or []),
+                "published": published,
+                "published_at": "2019-01-02T00:00:00Z" if published else None,
+                "user": self.users[0],
+                "body_html": "",
+                "body_markdown": data.get("body_markdown", ""),
+            }
+            self.articles.insert(0, article)
+            self.articles_by_id[id] = article
+        return (201, {}, article)
+
+    def update_article(self, request, id):
+        article = self.articles_by_id.get(int(id))
+        if article is None:
+            return self._not_found()
+        article.update((k, v) for k, v in (request["json"] or {}).items() if k in article)
+        return article
+
+    def user(self, request, id):
+        id = int(id)
+        return self.users[id - 1] if 1 <= id <= len(self.users) else self._not_found()
+
+    def user_by_username(self, request):
+        for user in self.users:
+            if user["username"] == request["params"].get("url"):
+                return user
+        return self._not_found()
+
+    def follow_suggestions(self, request):
+        if request["params"].get("state") != "follow_suggestions":
+            return self._not_found()
+        return self._page(self.users[1:], request)
+
+    def create_webhook(self, request):
+        data = request["json"] or {}
+        with self._lock:
+            id = self._next_id
+            self._next_id += 1
+            webhook = {
+                "type_of": "webhook_endpoint",
+                "id": id,
+                "source": data.get("source"),
+                "target_url": data.get("target_url"),
+                "events": data.get("events", []),
+                "created_at": "2019-01-01T00:00:00Z",
+                "user": self.users[0],
+            }
+            self.webhooks[id] = webhook
+        return (201, {}, webhook)
+
+    def webhook(self, request, id):
+        return self.webhooks.get(int(id)) or self._not_found()
+
+    def delete_webhook(self, request, id):
+        with self._lock:
+            webhook = self.webhooks.pop(int(id), None)
+        return webhook or self._not_found()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--articles", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--tags", type=int, default=20)
+    parser.add_argument("--body-size", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--jitter", type=float, default=0)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    server = FakeDevTo(**vars(args))
+    with server:
+        print(server.url, flush=True)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
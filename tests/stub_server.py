@@ -0,0 +1,87 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # the default backlog of 5 drops connections when many clients connect at once
+    request_queue_size = 128
+
+
+class StubServer:
+    """Tiny threaded http server used to test the api clients without hitting dev.to
+
+    Routes map (method, path) to a callable taking the request dict and returning either a json-able object
+    or a (status, headers, body) tuple.  Every request is recorded in `requests`, unless record is False.
+    """
+
+    def __init__(self, routes=None, port=0, record=True):
+        self.routes = dict(routes or {})
+        self.record = record
+        self.requests = []
+        self.connections = set()
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                split = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                request = {
+                    "method": self.command,
+                    "path": split.path[len("/api"):],
+                    "params": {k: v[0] for k, v in parse_qs(split.query).items()},
+                    "headers": dict(self.headers),
+                    "json": json.loads(body) if body else None,
+                }
+                if stub.record:
+                    with stub._lock:
+                        stub.requests.append(request)
+                        stub.connections.add(self.client_address)
+                route = stub.find_route(self.command, request["path"])
+                if route is None:
+                    result = (404, {}, {"error": "not found", "status": 404})
+                else:
+                    result = route(request)
+                if not isinstance(result, tuple):
+                    result = (200, {}, result)
+                status, headers, payload = result
+                data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+        self.httpd = _HTTPServer(("127.0.0.1", port), Handler)
+        self.url = "http://127.0.0.1:%s/api" % self.httpd.server_address[1]
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+        )
+
+    def route(self, method, path, fn):
+        self.routes[(method, path)] = fn
+
+    def find_route(self, method, path):
+        return self.routes.get((method, path))
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,165 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import pydevto
+from tests.stub_server import StubServer
+
+pytest.importorskip("aiohttp")
+
+
+@pytest.fixture
+def server():
+    with StubServer() as stub:
+        stub.route("GET", "/articles", lambda r: [{"id": 1, "page": r["params"].get("page")}])
+        stub.route("GET", "/articles/me/unpublished", lambda r: [{"id": 2}])
+        stub.route("PUT", "/articles/5", lambda r: dict(r["json"], id=5))
+        stub.route("GET", "/users", lambda r: [{"state": r["params"]["state"]}])
+        stub.route("POST", "/webhooks", lambda r: dict(r["json"], id=6))
+        yield stub
+
+
+def test_async_endpoints(server):
+    async def run():
+        async with pydevto.AsyncPyDevTo(api_key="KEY", base_url=server.url) as api:
+            return await asyncio.gather(
+                api.public_articles(page=3),
+                api.articles(state="unpublished"),
+                api.update_article(5, title="new"),
+                api.follow_suggestions(),
+                api.create_webhook("DEV", "https://example.com", ["article_created"]),
+            )
+
+    articles, unpublished, updated, suggestions, webhook = asyncio.run(run())
+    assert articles == [{"id": 1, "page": "3"}]
+    assert unpublished == [{"id": 2}]
+    assert updated == {"title": "new", "id": 5}
+    assert suggestions == [{"state": "follow_suggestions"}]
+    assert webhook["id"] == 6
+    assert all(r["headers"]["api-key"] == "KEY" for r in server.requests)
+
+
+def test_async_supplied_session(server):
+    import aiohttp
+
+    async def run():
+        async with aiohttp.ClientSession() as session:
+            api = pydevto.AsyncPyDevTo(api_key="KEY", base_url=server.url, session=session)
+            await api.articles(state="unpublished")
+            await api.create_webhook("DEV", "https://example.com", ["article_created"])
+            await api.close()
+            assert not session.closed and api.session is session
+            assert "api-key" not in session.headers
+
+    asyncio.run(run())
+    assert [r["headers"]["api-key"] for r in server.requests] == ["KEY", "KEY"]
+    assert server.requests[1]["json"]["source"] == "DEV"
+
+
+def test_async_supplied_session_timeout(server):
+    import aiohttp
+
+    server.route("GET", "/tags", lambda r: time.sleep(0.5) or [])
+
+    async def run():
+        async with aiohttp.ClientSession() as session:
+            api = pydevto.AsyncPyDevTo(base_url=server.url, session=session, timeout=0.1, max_retries=0)
+            started = time.perf_counter()
+            with pytest.raises(asyncio.TimeoutError):
+                await api.tags()
+            return time.perf_counter() - started
+
+    assert asyncio.run(run()) < 0.4
+
+
+def test_async_concurrency_limit(server):
+    lock = threading.Lock()
+    in_flight = [0, 0]  # current, max
+
+    def slow(request):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+        return {"id": 1}
+
+    server.route("GET", "/articles/1", slow)
+
+    async def run():
+        async with pydevto.AsyncPyDevTo(base_url=server.url, max_concurrency=4) as api:
+            return await asyncio.gather(*[api.public_article(1) for _ in range(20)])
+
+    assert asyncio.run(run()) == [{"id": 1}] * 20
+    assert in_flight[1] <= 4
+    assert len(server.connections) <= 4
+
+
+def test_async_iter_public_articles(server):
+    items = list(range(23))
+
+    def route(request):
+        page = int(request["params"]["page"])
+        return items[(page - 1) * 5:page * 5]
+
+    server.route("GET", "/articles", route)
+
+    async def run():
+        async with pydevto.AsyncPyDevTo(base_url=server.url) as api:
+            return [article async for article in api.iter_public_articles(per_page=5)]
+
+    assert asyncio.run(run()) == items
+
+
+def test_async_public_articles_by_id(server):
+    for article_id in range(10):
+        server.route("GET", "/articles/%s" % article_id, lambda r: {"path": r["path"]})
+
+    async def run():
+        async with pydevto.AsyncPyDevTo(base_url=server.url) as api:
+            return [r async for r in api.public_articles_by_id(range(10), max_workers=3, ordered=True)]
+
+    results = asyncio.run(run())
+    assert [r.id for r in results] == list(range(10))
+    assert results[5] == pydevto.pydevto.BulkResult(5, {"path": "/articles/5"}, None)
+
+
+def test_async_coalesce(server):
+    def slow(request):
+        time.sleep(0.2)
+        return {"id": 1}
+
+    server.route("GET", "/articles/1", slow)
+    server.route("GET", "/articles/404", lambda r: (404, {}, {"error": "not found", "status": 404}))
+
+    async def run():
+        async with pydevto.AsyncPyDevTo(base_url=server.url, coalesce=True) as api:
+            articles = await asyncio.gather(*[api.public_article(1) for _ in range(10)])
+            errors = await asyncio.gather(*[api.public_article(404) for _ in range(3)], return_exceptions=True)
+            # a cancelled waiter does not cancel the shared call
+            waiter = asyncio.ensure_future(api.public_article(1))
+            article = asyncio.ensure_future(api.public_article(1))
+            await asyncio.sleep(0.05)
+            waiter.cancel()
+            return articles, errors, await article, api.coalescer.stats()
+
+    articles, errors, article, stats = asyncio.run(run())
+    assert articles == [{"id": 1}] * 10 and article == {"id": 1}
+    assert all(isinstance(error, pydevto.PyDevToError) and error.status_code == 404 for error in errors)
+    assert len(server.requests) == 3
+    assert stats == {"executed": 3, "coalesced": 12, "in_flight": 0}
+
+
+def test_async_without_aiohttp(monkeypatch):
+    from pydevto import async_pydevto
+
+    monkeypatch.setattr(async_pydevto, "aiohttp", None)
+
+    async def run():
+        await pydevto.AsyncPyDevTo(base_url="http://127.0.0.1:1").tags()
+
+    with pytest.raises(ImportError, match=r"pydevto\[async\]"):
+        asyncio.run(run())
@@ -0,0 +1,100 @@
+import pytest
+
+import pydevto
+from tests.stub_server import StubServer
+
+
+def etag_route(request):
+    if request["headers"].get("If-None-Match") == '"v1"':
+        return (304, {"ETag": '"v1"'}, b"")
+    return (200, {"ETag": '"v1"'}, [{"name": "python"}])
+
+
+@pytest.fixture
+def server():
+    with StubServer() as stub:
+        stub.route("GET", "/tags", etag_route)
+        stub.route("GET", "/users/me", lambda r: {"username": "me"})
+        stub.route("PUT", "/articles/1", lambda r: {"id": 1})
+        yield stub
+
+
+def test_fresh_responses_served_from_cache(server):
+    cache = pydevto.ResponseCache(ttl=60)
+    api = pydevto.PyDevTo(base_url=server.url, cache=cache)
+    assert api.tags() == api.tags() == [{"name": "python"}]
+    assert api.tags(page=2) == [{"name": "python"}]
+    api.update_article(1, title="x")
+    api.update_article(1, title="x")
+    assert len(server.requests) == 4
+    assert cache.stats() == {"hits": 1, "misses": 2, "revalidations": 0, "evictions": 0, "size": 2}
+
+
+def test_stale_responses_revalidated(server):
+    cache = pydevto.ResponseCache(ttl=0)
+    api = pydevto.PyDevTo(base_url=server.url, cache=cache)
+    assert api.tags() == api.tags() == [{"name": "python"}]
+    assert server.requests[1]["headers"]["If-None-Match"] == '"v1"'
+    assert cache.revalidations == 1
+
+
+def test_stale_responses_without_validators_evicted(server):
+    cache = pydevto.ResponseCache(ttl=0)
+    api = pydevto.PyDevTo(base_url=server.url, cache=cache)
+    api.user()
+    api.user()
+    assert "If-None-Match" not in server.requests[1]["headers"]
+    assert cache.stats()["size"] == 1
+
+
+def test_cache_keyed_by_api_key(server):
+    cache = pydevto.ResponseCache()
+    pydevto.PyDevTo(api_key="a", base_url=server.url, cache=cache).user()
+    pydevto.PyDevTo(api_key="b", base_url=server.url, cache=cache).user()
+    assert len(server.requests) == 2
+
+
+def test_lru_eviction():
+    cache = pydevto.ResponseCache(maxsize=2)
+    for key in "abc":
+        cache.store(key, key)
+    assert cache.lookup("a") == (None, False)
+    assert cache.lookup("c")[0].data == "c"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disk_cache_survives_restart(server, tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = pydevto.ResponseCache(path=path)
+    pydevto.PyDevTo(base_url=server.url, cache=cache).tags()
+    cache.close()
+
+    cache = pydevto.ResponseCache(path=path)
+    assert pydevto.PyDevTo(base_url=server.url, cache=cache).tags() == [{"name": "python"}]
+    assert len(server.requests) == 1
+    assert cache.hits == 1
+
+
+def test_markdown_cache(monkeypatch):
+    cache = pydevto.MarkdownCache(maxsize=2)
+    assert pydevto.html_to_markdown("<b>x</b>", cache=cache) == "**x**"
+    assert pydevto.html_to_markdown("<b>x</b>", cache=cache) == "**x**"
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "evictions": 0, "size": 1}
+
+    # a converter with other options or another version does not reuse the result
+    converter = pydevto.markdown_converter.MarkdownConverter()
+    assert cache.key("<b>x</b>", converter) != cache.key("<b>x</b>", pydevto.markdown_converter.default_converter())
+    key = cache.key("<b>x</b>", converter)
+    monkeypatch.setattr(converter, "version", converter.version + 1)
+    assert cache.key("<b>x</b>", converter) != key
+
+
+def test_markdown_cache_on_disk(tmp_path):
+    path = str(tmp_path / "markdown.sqlite")
+    cache = pydevto.MarkdownCache(path=path)
+    pydevto.html_to_markdown("<h1>heading</h1>", cache=cache)
+    cache.close()
+
+    cache = pydevto.MarkdownCache(path=path)
+    assert pydevto.html_to_markdown("<h1>heading</h1>", cache=cache) == "# heading\n\n"
+    assert cache.hits == 1
@@ -0,0 +1,164 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+import pydevto
+from tests.stub_server import StubServer
+
+
+@pytest.fixture
+def server():
+    with StubServer() as stub:
+        stub.route("GET", "/articles", lambda r: [{"id": 1, "page": r["params"].get("page")}])
+        stub.route("GET", "/articles/1", lambda r: {"id": 1})
+        stub.route("GET", "/articles/me/all", lambda r: [{"id": 2}])
+        stub.route("POST", "/articles", lambda r: dict(r["json"], id=3))
+        stub.route("GET", "/tags", lambda r: [{"name": "python"}])
+        stub.route("DELETE", "/webhooks/4", lambda r: {"id": 4})
+        yield stub
+
+
+def test_endpoints_use_base_url(server):
+    api = pydevto.PyDevTo(api_key="KEY", base_url=server.url)
+    assert api.public_articles(page=2) == [{"id": 1, "page": "2"}]
+    assert api.public_article(1) == {"id": 1}
+    assert api.articles(state="all") == [{"id": 2}]
+    assert api.create_article("title") == {"title": "title", "body_markdown": "", "id": 3}
+    assert api.delete_webhook(4) == {"id": 4}
+    assert all(r["headers"]["api-key"] == "KEY" for r in server.requests)
+
+
+def test_connections_are_reused(server):
+    with pydevto.PyDevTo(base_url=server.url) as api:
+        for _ in range(5):
+            api.tags()
+    assert len(server.requests) == 5
+    assert len(server.connections) == 1
+
+
+def test_keep_alive_disabled(server):
+    with pydevto.PyDevTo(base_url=server.url, keep_alive=False) as api:
+        for _ in range(3):
+            api.tags()
+    assert len(server.connections) == 3
+
+
+def test_client_shared_across_threads(server):
+    api = pydevto.PyDevTo(base_url=server.url, pool_maxsize=4, pool_block=True)
+    threads = [threading.Thread(target=lambda: [api.tags() for _ in range(5)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    api.close()
+    assert len(server.requests) == 20
+    assert len(server.connections) <= 4
+
+
+def test_close_releases_session(server):
+    api = pydevto.PyDevTo(base_url=server.url)
+    session = api.session
+    api.close()
+    assert api.session is not session
+
+
+def test_supplied_session(server):
+    session = requests.Session()
+    api = pydevto.PyDevTo(api_key="KEY", base_url=server.url, headers={"X-Extra": "1"}, session=session)
+    assert api.articles(state="all") == [{"id": 2}]
+    assert server.requests[-1]["headers"]["api-key"] == "KEY"
+    assert server.requests[-1]["headers"]["X-Extra"] == "1"
+    assert "api-key" not in session.headers
+    api.close()
+    assert api.session is session
+    api.tags()
+    assert len(server.requests) == 2
+    session.close()
+
+
+def paginated(items):
+    def route(request):
+        page = int(request["params"].get("page", 1))
+        per_page = int(request["params"].get("per_page", 10))
+        return items[(page - 1) * per_page:page * per_page]
+
+    return route
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_iter_articles_stops_on_short_page(server, prefetch):
+    server.route("GET", "/articles/me/all", paginated(list(range(25))))
+    api = pydevto.PyDevTo(base_url=server.url)
+    assert list(api.iter_articles(state="all", per_page=10, prefetch=prefetch)) == list(range(25))
+    pages = sorted(int(r["params"]["page"]) for r in server.requests)
+    assert pages[:3] == [1, 2, 3]
+    assert len(pages) <= 3 + prefetch
+
+
+def test_iter_tags_stops_on_empty_page(server):
+    server.route("GET", "/tags", paginated(list(range(20))))
+    api = pydevto.PyDevTo(base_url=server.url)
+    assert list(api.iter_tags()) == list(range(20))
+
+
+def test_iter_public_articles_is_lazy(server):
+    server.route("GET", "/articles", paginated(list(range(1000))))
+    api = pydevto.PyDevTo(base_url=server.url)
+    articles = api.iter_public_articles(tag="python", per_page=10, prefetch=1)
+    assert [next(articles) for _ in range(15)] == list(range(15))
+    articles.close()
+    assert len(server.requests) <= 3
+    assert server.requests[0]["params"]["tag"] == "python"
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_public_articles_by_id(server, ordered):
+    def route(request):
+        article_id = int(request["path"].rsplit("/", 1)[1])
+        if article_id == 13:
+            return (404, {}, {"error": "not found", "status": 404})
+        return {"id": article_id}
+
+    for article_id in range(30):
+        server.route("GET", "/articles/%s" % article_id, route)
+    api = pydevto.PyDevTo(base_url=server.url)
+    results = list(api.public_articles_by_id(range(30), max_workers=4, ordered=ordered))
+    if ordered:
+        assert [r.id for r in results] == list(range(30))
+    results.sort(key=lambda r: r.id)
+    assert [r.result for r in results if r.id != 13] == [{"id": i} for i in range(30) if i != 13]
+    assert results[13].result is None and results[13].error.status_code == 404
+
+
+def test_coalesce_concurrent_gets(server):
+    gate = threading.Event()
+
+    def slow(request):
+        gate.wait(5)
+        return {"username": request["params"]["url"]}
+
+    server.route("GET", "/users/by_username", slow)
+    server.route("GET", "/articles/404", lambda r: (404, {}, {"error": "not found", "status": 404}))
+    api = pydevto.PyDevTo(base_url=server.url, coalesce=True)
+    usernames = ["ben"] * 8 + ["jess"] * 4
+    with ThreadPoolExecutor(max_workers=len(usernames)) as executor:
+        futures = [executor.submit(api.user, username=username) for username in usernames]
+        while api.coalescer.stats()["coalesced"] < len(usernames) - 2:
+            time.sleep(0.01)
+        gate.set()
+        results = [future.result() for future in futures]
+    assert results == [{"username": username} for username in usernames]
+    assert len(server.requests) == 2
+    assert api.coalescer.stats() == {"executed": 2, "coalesced": 10, "in_flight": 0}
+
+    # errors are raised as usual, and once a call completes the next identical one goes out again
+    with pytest.raises(pydevto.PyDevToError):
+        api.public_article(404)
+    api.user(username="ben")
+    assert len(server.requests) == 4
+    # writes are never coalesced
+    api.create_article(title="a")
+    assert api.coalescer.stats()["executed"] == 4
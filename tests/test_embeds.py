@@ -0,0 +1,41 @@
+import pytest
+
+import pydevto
+from pydevto.embeds import EmbedResolver
+from pydevto.markdown_converter import MarkdownConverter
+
+
+def test_builtin_providers():
+    embeds = EmbedResolver()
+    assert embeds.resolve("https://www.youtube.com/watch?v=kmjiUVEMvI4") == "\n{% youtube kmjiUVEMvI4 %}\n"
+    assert embeds.resolve("//github.com/lpellis/pydevto") == "\n{% github //github.com/lpellis/pydevto %}\n"
+    assert embeds.resolve("https://example.com/x") == "\nhttps://example.com/x\n"
+    assert embeds.unwrap("https://cdn.embedly.com/widgets/media.html?src=https%3A%2F%2Frepl.it%2F%40a%2Fb") == (
+        "https://repl.it/@a/b"
+    )
+
+
+def test_register_provider():
+    embeds = EmbedResolver()
+    assert embeds.resolve("https://gist.github.com/a/1") == "\nhttps://gist.github.com/a/1\n"
+    embeds.register("gist.github.com", tag="gist")
+    embeds.register("stackblitz.com", lambda url, parts: "\n{% stackblitz " + parts.path.split("/")[-1] + " %}\n")
+    assert embeds.resolve("https://gist.github.com/a/1") == "\n{% gist https://gist.github.com/a/1 %}\n"
+    assert embeds.resolve("https://stackblitz.com/edit/demo") == "\n{% stackblitz demo %}\n"
+    # the longest matching host wins
+    embeds.register("twitter.com.au", tag="link")
+    assert embeds.resolve("https://twitter.com.au/x") == "\n{% link https://twitter.com.au/x %}\n"
+    assert embeds.resolve("https://twitter.com/NASA/status/1") == "\n{% twitter 1 %}\n"
+    with pytest.raises(ValueError):
+        embeds.register("example.com")
+
+
+def test_converter_embeds_option():
+    embeds = EmbedResolver()
+    embeds.register("gist.github.com", tag="gist")
+    converter = MarkdownConverter(embeds=embeds)
+    html = '<iframe src="https://gist.github.com/a/1"></iframe>'
+    assert converter.convert(html) == "\n{% gist https://gist.github.com/a/1 %}\n"
+    assert pydevto.html_to_markdown(html) == "\nhttps://gist.github.com/a/1\n"
+    cache = pydevto.MarkdownCache()
+    assert cache.key(html, converter) != cache.key(html, MarkdownConverter())
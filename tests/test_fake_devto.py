@@ -0,0 +1,67 @@
+import pytest
+
+import pydevto
+from tests.fake_devto import FakeDevTo
+
+
+def test_fake_devto_endpoints():
+    with FakeDevTo(articles=95, users=4, tags=8) as server:
+        api = pydevto.PyDevTo(base_url=server.url, api_key="KEY")
+        articles = list(api.iter_public_articles(per_page=10))
+        assert [article["id"] for article in articles] == [id for id in range(95, 0, -1) if id % 5]
+        assert "body_html" not in articles[0]
+        assert api.public_article(94)["body_html"].startswith("<h2>")
+        assert all("tag3" in article["tag_list"] for article in api.public_articles(tag="tag3"))
+        assert {article["user"]["username"] for article in api.public_articles(username="user2")} == {"user2"}
+
+        assert all(article["user"]["id"] == 1 for article in api.articles(state="all", per_page=100))
+        assert len(api.articles(state="all", per_page=100)) == 24
+        assert len(api.articles(state="unpublished")) == 5
+        assert len(api.articles()) == 19
+        assert api.user()["id"] == 1 and api.user(id=3)["username"] == "user3"
+        assert api.user(username="user4")["id"] == 4
+        assert len(api.follow_suggestions()) == 3
+        assert len(api.tags(per_page=5)) == 5
+
+        created = api.create_article(title="New", published=True, tags=["python"])
+        assert api.public_articles()[0]["id"] == created["id"]
+        assert api.update_article(created["id"], title="Renamed")["title"] == "Renamed"
+
+        webhook = api.create_webhook("DEV", "https://example.com/hook", ["article_created"])
+        assert api.webhook(webhook["id"])["target_url"] == "https://example.com/hook"
+        assert [w["id"] for w in api.webhooks()] == [webhook["id"]]
+        api.delete_webhook(webhook["id"])
+        assert api.webhooks() == []
+
+        with pytest.raises(pydevto.PyDevToError) as e:
+            pydevto.PyDevTo(base_url=server.url).articles()
+        assert e.value.status_code == 401
+
+
+def test_fake_devto_rate_limit_and_errors():
+    with FakeDevTo(articles=10, rate_limit=5, burst=2) as server:
+        api = pydevto.PyDevTo(base_url=server.url, max_retries=0)
+        statuses = []
+        for _ in range(4):
+            try:
+                api.tags()
+                statuses.append(200)
+            except pydevto.PyDevToError as e:
+                statuses.append(e.status_code)
+                assert e.response.headers["Retry-After"] == "1"
+        assert statuses == [200, 200, 429, 429]
+        assert server.stats == {200: 2, 429: 2}
+
+    with FakeDevTo(articles=10, error_rate=0.5, seed=1) as server:
+        api = pydevto.PyDevTo(base_url=server.url, max_retries=0)
+        failures = 0
+        for _ in range(40):
+            try:
+                api.tags()
+            except pydevto.PyDevToError as e:
+                assert e.status_code == 503
+                failures += 1
+        assert 5 < failures < 35
+        # retries get through the injected errors
+        retrying = pydevto.PyDevTo(base_url=server.url, max_retries=10, backoff_factor=0.001)
+        assert len(retrying.tags()) == 20
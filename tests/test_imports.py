@@ -0,0 +1,36 @@
+import subprocess
+import sys
+
+import pytest
+
+import pydevto
+
+HEAVY = ["requests", "bs4", "aiohttp", "asyncio", "multiprocessing"]
+
+
+def loaded_modules(code):
+    script = "import sys; %s; print(' '.join(m for m in %r if m in sys.modules))" % (code, HEAVY)
+    return subprocess.check_output([sys.executable, "-c", script], text=True).split()
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ("import pydevto", []),
+        ("import pydevto; pydevto.PyDevTo", ["requests"]),
+        ("import pydevto; pydevto.html_to_markdown", ["bs4"]),
+        ("import pydevto; pydevto.RateLimiter; pydevto.Article", []),
+        ("import pydevto; pydevto.markdown_converter.MarkdownConverter", ["bs4"]),
+        ("import pydevto; pydevto.pydevto.BulkResult", ["requests"]),
+    ],
+)
+def test_lazy_imports(code, expected):
+    assert loaded_modules(code) == expected
+
+
+def test_lazy_exports():
+    assert "html_to_markdown" in dir(pydevto)
+    for name in pydevto.__all__:
+        assert getattr(pydevto, name) is not None
+    with pytest.raises(AttributeError):
+        pydevto.missing
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+import pydevto
+from tests.stub_server import StubServer
+
+
+class Recorder(pydevto.RequestObserver):
+    def __init__(self):
+        self.calls = []
+
+    def before_request(self, event):
+        self.calls.append(("before", event.method, event.endpoint))
+
+    def after_request(self, event):
+        self.calls.append(("after", event.status_code, event.error is not None))
+
+
+@pytest.fixture
+def server():
+    with StubServer() as stub:
+        stub.route("GET", "/articles/1", lambda r: {"id": 1, "body_html": "x" * 1000})
+        stub.route("GET", "/articles/2", lambda r: {"id": 2})
+        stub.route("POST", "/articles", lambda r: {"id": 3})
+        yield stub
+
+
+def test_observer_hooks(server):
+    recorder = Recorder()
+    api = pydevto.PyDevTo(base_url=server.url, observers=[recorder])
+    api.public_article(1)
+    with pytest.raises(pydevto.PyDevToError):
+        api.public_article(9)
+    assert recorder.calls == [
+        ("before", "GET", "/articles/{id}"),
+        ("after", 200, False),
+        ("before", "GET", "/articles/{id}"),
+        ("after", 404, True),
+    ]
+
+
+def test_metrics_collector(server):
+    metrics = pydevto.MetricsCollector(buckets=[0.0001, 10])
+    cache = pydevto.ResponseCache()
+    api = pydevto.PyDevTo(base_url=server.url, observers=[metrics], cache=cache)
+    api.public_article(1)
+    api.public_article(2)
+    api.public_article(2)
+    api.create_article("title")
+    snapshot = metrics.to_dict()
+    assert snapshot["in_flight"] == 0 and snapshot["max_in_flight"] == 1
+    article = snapshot["endpoints"]["GET /articles/{id}"]
+    assert article["count"] == 3
+    assert article["cache_hits"] == 1
+    assert article["status_codes"] == {200: 2}
+    assert article["bytes_received"] > 1000
+    assert article["latency"]["buckets"][float("inf")] == 3
+    assert snapshot["endpoints"]["POST /articles"]["bytes_sent"] > 0
+
+    text = metrics.prometheus()
+    assert 'pydevto_request_duration_seconds_bucket{method="GET",endpoint="/articles/{id}",le="+Inf"} 3' in text
+    assert 'pydevto_responses_total{method="POST",endpoint="/articles",status="200"} 1' in text
+    assert "pydevto_requests_in_flight 0" in text
+
+
+def test_async_metrics(server):
+    pytest.importorskip("aiohttp")
+    metrics = pydevto.MetricsCollector()
+
+    async def run():
+        async with pydevto.AsyncPyDevTo(base_url=server.url, observers=[metrics]) as api:
+            await asyncio.gather(api.public_article(1), api.create_article("title"))
+
+    asyncio.run(run())
+    endpoints = metrics.to_dict()["endpoints"]
+    assert endpoints["GET /articles/{id}"]["bytes_received"] > 1000
+    assert endpoints["POST /articles"]["bytes_sent"] > 0
@@ -0,0 +1,79 @@
+import pytest
+
+import pydevto
+from tests.stub_server import StubServer
+
+
+def make_article(id, edited_at=None):
+    return {"id": id, "published_at": "2019-01-01T00:00:%02dZ" % id, "edited_at": edited_at, "tag_list": ["python"]}
+
+
+class Feed:
+    """Newest first /articles feed that can be made to fail at a given page"""
+
+    def __init__(self, count):
+        self.articles = [make_article(id) for id in range(count, 0, -1)]
+        self.fail_page = None
+
+    def __call__(self, request):
+        page = int(request["params"]["page"])
+        per_page = int(request["params"]["per_page"])
+        if page == self.fail_page:
+            return (500, {}, {"error": "boom"})
+        return self.articles[(page - 1) * per_page:page * per_page]
+
+    def publish(self, id):
+        self.articles.insert(0, make_article(id))
+
+
+@pytest.fixture
+def feed():
+    with StubServer() as stub:
+        stub.feed = Feed(25)
+        stub.route("GET", "/articles", stub.feed)
+        yield stub
+
+
+def pages(server):
+    return [int(r["params"]["page"]) for r in server.requests]
+
+
+def test_incremental_sync(feed, tmp_path):
+    api = pydevto.PyDevTo(base_url=feed.url)
+    with pydevto.ArticleMirror(api, str(tmp_path / "m.sqlite"), per_page=10) as mirror:
+        assert mirror.sync(tag="python") == {"pages": 3, "new": 25, "updated": 0}
+        assert len(list(mirror.articles(tag="python"))) == 25
+
+        del feed.requests[:]
+        assert mirror.sync(tag="python") == {"pages": 1, "new": 0, "updated": 0}
+
+        feed.feed.publish(26)
+        feed.feed.articles[5]["edited_at"] = "2020-01-01T00:00:00Z"
+        del feed.requests[:]
+        assert mirror.sync(tag="python") == {"pages": 2, "new": 1, "updated": 1}
+        assert next(mirror.articles())["id"] == 26
+        assert list(mirror.articles(username="ben")) == []
+
+
+def test_interrupted_sync_resumes(feed, tmp_path):
+    api = pydevto.PyDevTo(base_url=feed.url, max_retries=0)
+    path = str(tmp_path / "m.sqlite")
+    feed.feed.fail_page = 2
+    with pydevto.ArticleMirror(api, path, per_page=5) as mirror:
+        with pytest.raises(pydevto.PyDevToError):
+            mirror.sync(username="ben")
+
+    feed.feed.fail_page = None
+    feed.feed.publish(26)
+    del feed.requests[:]
+    with pydevto.ArticleMirror(api, path, per_page=5) as mirror:
+        stats = mirror.sync(username="ben")
+        assert len(list(mirror.articles(username="ben"))) == 26
+    assert stats["new"] == 21
+    assert pages(feed) == [2, 3, 4, 5, 6, 1, 2]
+
+
+def test_source_required(tmp_path):
+    with pydevto.ArticleMirror(None, str(tmp_path / "m.sqlite")) as mirror:
+        with pytest.raises(ValueError):
+            mirror.sync()
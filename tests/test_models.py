@@ -0,0 +1,61 @@
+import pytest
+
+import pydevto
+from pydevto.models import Article
+from tests.stub_server import StubServer
+
+ARTICLE = {
+    "type_of": "article",
+    "id": 1,
+    "title": "Title",
+    "tag_list": ["python"],
+    "body_html": "<p>%s</p>" % ("lorem ipsum " * 100),
+    "body_markdown": "short",
+    "user": {"username": "ben", "name": "Ben"},
+    "something_new": {"a": 1},
+}
+
+
+def test_article_round_trip():
+    article = Article(ARTICLE)
+    assert article.title == article["title"] == "Title"
+    assert article.user.username == "ben"
+    assert article.something_new == {"a": 1}
+    assert article.get("missing", 3) == 3
+    assert article.cover_image is None
+    assert article.to_dict() == ARTICLE
+    assert not hasattr(article, "__dict__")
+    with pytest.raises(KeyError):
+        article["missing"]
+
+
+def test_article_behaves_like_the_dict():
+    article = Article(ARTICLE)
+    assert "title" in article and "something_new" in article
+    assert "cover_image" not in article and "missing" not in article and 0 not in article
+    assert list(article) == list(article.keys()) and sorted(article) == sorted(ARTICLE)
+    assert article.get("description", "DEF") == "DEF"
+    assert article.get("body_html") == ARTICLE["body_html"]
+    with pytest.raises(KeyError):
+        article["cover_image"]
+
+
+def test_large_text_fields_decoded_lazily():
+    article = Article(ARTICLE)
+    assert isinstance(article._body_html, bytes)
+    assert len(article._body_html) < len(ARTICLE["body_html"])
+    assert article._body_markdown == "short"
+    assert article.body_html == ARTICLE["body_html"]
+    assert article._body_html == ARTICLE["body_html"]
+
+
+def test_client_returns_models():
+    with StubServer() as server:
+        server.route("GET", "/articles", lambda r: [ARTICLE])
+        server.route("GET", "/users/me", lambda r: {"id": 2, "username": "me"})
+        server.route("GET", "/tags", lambda r: [{"id": 3, "name": "python"}])
+        api = pydevto.PyDevTo(base_url=server.url, models=True)
+        assert api.public_articles() == [Article(ARTICLE)]
+        assert isinstance(api.user(), pydevto.User)
+        assert [tag.name for tag in api.tags()] == ["python"]
+        assert pydevto.PyDevTo(base_url=server.url).tags() == [{"id": 3, "name": "python"}]
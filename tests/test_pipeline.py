@@ -0,0 +1,57 @@
+import pytest
+
+import pydevto
+from pydevto.pipeline import public_articles_markdown
+from tests.stub_server import StubServer
+
+
+def body_html(article_id):
+    return "<h1>Article %s</h1><p>Some <b>bold</b> text</p>" % article_id
+
+
+@pytest.fixture
+def server():
+    def route(request):
+        article_id = int(request["path"].rsplit("/", 1)[1])
+        if article_id == 13:
+            return (404, {}, {"error": "not found", "status": 404})
+        if article_id == 7:
+            return {"id": article_id, "body_html": None}
+        if article_id == 21:
+            return {"id": article_id}
+        return {"id": article_id, "body_html": body_html(article_id)}
+
+    with StubServer() as stub:
+        for article_id in range(30):
+            stub.route("GET", "/articles/%s" % article_id, route)
+        yield stub
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_public_articles_markdown(server, ordered):
+    api = pydevto.PyDevTo(base_url=server.url)
+    results = list(
+        public_articles_markdown(api, range(30), fetch_workers=4, convert_workers=2, queue_size=3, ordered=ordered)
+    )
+    if ordered:
+        assert [r.id for r in results] == list(range(30))
+    results.sort(key=lambda r: r.id)
+    for result in results:
+        if result.id not in (7, 13, 21):
+            assert result.markdown == pydevto.html_to_markdown(body_html(result.id))
+            assert result.error is None
+    assert results[13].markdown is None and results[13].error.status_code == 404
+    # conversion errors come back from the worker processes
+    assert results[7].markdown is None and results[7].error is not None
+    # and an article the fetch thread can't submit does not stop the others
+    assert results[21].markdown is None and isinstance(results[21].error, KeyError)
+
+
+def test_public_articles_markdown_backpressure(server):
+    api = pydevto.PyDevTo(base_url=server.url)
+    results = public_articles_markdown(api, range(30), fetch_workers=2, convert_workers=1, queue_size=2, ordered=True)
+    assert next(results).id == 0
+    results.close()
+    # fetching pauses once queue_size articles wait for the caller: at most the 2 slots, the slot freed on close,
+    # the article blocked on a slot and the 2 * fetch_workers fetches in flight are ever requested
+    assert len(server.requests) <= 2 + 1 + 1 + 2 * 2
@@ -0,0 +1,99 @@
+import itertools
+import threading
+
+import pytest
+
+import pydevto
+from pydevto.publisher import parse_front_matter
+from tests.stub_server import StubServer
+
+
+class FakeDevTo:
+    """Keeps articles in memory behind the /articles endpoints of a stub server"""
+
+    def __init__(self, stub):
+        self.articles = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        stub.route("GET", "/articles/me/all", self.list)
+        stub.route("POST", "/articles", self.create)
+        for id in range(1, 20):
+            stub.route("PUT", "/articles/%s" % id, self.update)
+
+    def list(self, request):
+        page = int(request["params"]["page"])
+        return list(self.articles.values()) if page == 1 else []
+
+    def create(self, request):
+        with self.lock:
+            article = dict(request["json"], id=next(self.ids))
+            self.articles[article["id"]] = article
+        return article
+
+    def update(self, request):
+        id = int(request["path"].rsplit("/", 1)[1])
+        self.articles[id].update(request["json"])
+        return self.articles[id]
+
+
+@pytest.fixture
+def server():
+    with StubServer() as stub:
+        stub.fake = FakeDevTo(stub)
+        yield stub
+
+
+def write_posts(directory, count):
+    for i in range(count):
+        (directory / ("post%s.md" % i)).write_text(
+            "---\ntitle: Post %s\ntags: python, devto\npublished: false\n---\n\n# Body %s\n" % (i, i)
+        )
+
+
+def writes(server):
+    return [r for r in server.requests if r["method"] != "GET"]
+
+
+def test_parse_front_matter():
+    meta, body = parse_front_matter("---\ntitle: \"A: title\"\ntags: [a, b]\npublished: true\n---\n\nbody\n")
+    assert meta == {"title": "A: title", "tags": ["a", "b"], "published": True}
+    assert body == "body\n"
+    assert parse_front_matter("no front matter") == ({}, "no front matter")
+
+
+def test_publish_only_sends_changes(server, tmp_path):
+    write_posts(tmp_path, 5)
+    api = pydevto.PyDevTo(base_url=server.url)
+    results = pydevto.DirectoryPublisher(api, str(tmp_path)).publish()
+    assert [r.action for r in results] == ["created"] * 5
+    first = server.fake.articles[results[0].id]
+    assert first["title"] == "Post 0"
+    assert first["tags"] == ["python", "devto"]
+    assert first["body_markdown"] == "# Body 0\n"
+
+    del server.requests[:]
+    results = pydevto.DirectoryPublisher(api, str(tmp_path)).publish()
+    assert [r.action for r in results] == ["unchanged"] * 5
+    assert writes(server) == []
+
+    (tmp_path / "post3.md").write_text("---\ntitle: Post 3\n---\nnew body")
+    del server.requests[:]
+    results = pydevto.DirectoryPublisher(api, str(tmp_path)).publish()
+    assert [(r.path, r.action) for r in results if r.action != "unchanged"] == [("post3.md", "updated")]
+    assert [r["path"] for r in writes(server)] == ["/articles/%s" % results[3].id]
+
+
+def test_publish_adopts_existing_articles_by_title(server, tmp_path):
+    write_posts(tmp_path, 2)
+    server.fake.articles[next(server.fake.ids)] = {"id": 1, "title": "Post 1"}
+    api = pydevto.PyDevTo(base_url=server.url)
+    results = pydevto.DirectoryPublisher(api, str(tmp_path), manifest_path=str(tmp_path / "m.json")).publish()
+    assert [(r.action, r.id) for r in results] == [("created", 2), ("updated", 1)]
+
+
+def test_publish_dry_run(server, tmp_path):
+    write_posts(tmp_path, 2)
+    api = pydevto.PyDevTo(base_url=server.url)
+    results = pydevto.DirectoryPublisher(api, str(tmp_path)).publish(dry_run=True)
+    assert [r.action for r in results] == ["created", "created"]
+    assert writes(server) == []
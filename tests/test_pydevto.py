@@ -2,6 +2,12 @@ import pytest
 
 import pydevto
 from pydevto import __version__
+from pydevto.markdown_converter import available_parsers
+
+
+@pytest.fixture(params=available_parsers())
+def parser(request):
+    return request.param
 
 
 def test_version():
@@ -26,8 +32,8 @@ def test_version():
         ("<ul><li>item1</li><li>item2</li></ul>", "\n* item1\n* item2\n\n"),
     ],
 )
-def test_html_to_markdown_basic(html, result):
-    assert pydevto.html_to_markdown(html) == result
+def test_html_to_markdown_basic(html, result, parser):
+    assert pydevto.html_to_markdown(html, parser=parser) == result
 
 
 @pytest.mark.parametrize(
@@ -37,8 +43,8 @@ def test_html_to_markdown_basic(html, result):
         ("<i>italic</i><b>bold</b>", "*italic***bold**"),
     ],
 )
-def test_html_to_markdown_nested(html, result):
-    assert pydevto.html_to_markdown(html) == result
+def test_html_to_markdown_nested(html, result, parser):
+    assert pydevto.html_to_markdown(html, parser=parser) == result
 
 
 @pytest.mark.parametrize(
@@ -66,8 +72,8 @@ def test_html_to_markdown_nested(html, result):
         ),
     ],
 )
-def test_html_to_markdown_links(html, result):
-    assert pydevto.html_to_markdown(html) == result
+def test_html_to_markdown_links(html, result, parser):
+    assert pydevto.html_to_markdown(html, parser=parser) == result
 
 
 @pytest.mark.parametrize(
@@ -87,8 +93,8 @@ def test_html_to_markdown_links(html, result):
         ),
     ],
 )
-def test_html_to_markdown_images(html, result):
-    assert pydevto.html_to_markdown(html) == result
+def test_html_to_markdown_images(html, result, parser):
+    assert pydevto.html_to_markdown(html, parser=parser) == result
 
 
 @pytest.mark.parametrize(
@@ -108,8 +114,8 @@ def test_html_to_markdown_images(html, result):
         ),
     ],
 )
-def test_html_to_markdown_embeds(html, result):
-    assert pydevto.html_to_markdown(html) == result
+def test_html_to_markdown_embeds(html, result, parser):
+    assert pydevto.html_to_markdown(html, parser=parser) == result
 
 @pytest.mark.parametrize(
     "html,result",
@@ -120,8 +126,8 @@ def test_html_to_markdown_embeds(html, result):
         ),
     ],
 )
-def test_html_to_markdown_embeds_unknown(html, result):
-    assert pydevto.html_to_markdown(html) == result
+def test_html_to_markdown_embeds_unknown(html, result, parser):
+    assert pydevto.html_to_markdown(html, parser=parser) == result
 
 @pytest.mark.parametrize(
     "html,result",
@@ -148,8 +154,8 @@ def test_html_to_markdown_embeds_unknown(html, result):
         ),
     ],
 )
-def test_html_to_markdown_embeds_unfurl(html, result):
-    assert pydevto.html_to_markdown(html) == result
+def test_html_to_markdown_embeds_unfurl(html, result, parser):
+    assert pydevto.html_to_markdown(html, parser=parser) == result
 
 @pytest.mark.parametrize(
     "html,result",
@@ -160,5 +166,139 @@ def test_html_to_markdown_embeds_unfurl(html, result):
         ),
     ],
 )
-def test_html_to_markdown_embedly(html, result):
-    assert pydevto.html_to_markdown(html) == result
+def test_html_to_markdown_embedly(html, result, parser):
+    assert pydevto.html_to_markdown(html, parser=parser) == result
+
+
+def test_html_to_markdown_deep_nesting(parser):
+    depth = 5000
+    html = "<div>" * depth + "<b>deep_text</b>" + "</div>" * depth
+    assert pydevto.html_to_markdown(html, parser=parser) == "**deep\\_text**"
+
+
+def test_converter_dispatch_includes_subclass_methods():
+    class Converter(pydevto.markdown_converter.MarkdownConverter):
+        def convert_code(self, el, text):
+            return "`%s`" % text
+
+    converter = Converter(strip=["b"])
+    assert converter.convert("<code>x</code><b>y</b><h3>z</h3>") == "`x`y### z\n\n"
+    assert converter.dispatch("b") is None
+    assert converter.dispatch("unknown") is None
+
+
+def test_html_to_markdown_reuses_default_converter():
+    converter = pydevto.markdown_converter.default_converter()
+    pydevto.html_to_markdown("<b>x</b>")
+    assert pydevto.markdown_converter.default_converter() is converter
+
+
+@pytest.mark.parametrize(
+    "html,result",
+    [
+        ("<ol><li>a</li><li>b</li><li>c</li></ol>", "\n1. a\n2. b\n3. c\n\n"),
+        ("<ul><li>a<ul><li>b<ul><li>c</li></ul></li></ul></li></ul>", "\n* a\n\n\t+ b\n\t\n\t\t- c\n\t\t\n\t\n\t\n\n\n"),
+        ("<ol><li>a<ol><li>b</li></ol></li></ol>", "\n1. a\n\n\t1. b\n\t\n\n\n"),
+    ],
+)
+def test_html_to_markdown_lists(html, result, parser):
+    assert pydevto.html_to_markdown(html, parser=parser) == result
+
+
+def test_html_to_markdown_long_ordered_list(parser):
+    html = "<ol>%s</ol>" % "".join("<li>item</li>" for _ in range(3000))
+    assert pydevto.html_to_markdown(html, parser=parser).endswith("\n2999. item\n3000. item\n\n")
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        "<h1>heading</h1><p>some <b>bold</b> and <a href=\"http://example.com\" title=\"t\">a link</a></p><hr>",
+        "<ul><li>a<ul><li>b</li></ul></li></ul><ol><li>x</li><!-- c --><li>y</li></ol>",
+        '<iframe src="https://www.youtube.com/embed/kmjiUVEMvI4"></iframe><img src="a.png" alt="alt_text">',
+        '<blockquote class="twitter-tweet"><p>tweet</p>&mdash; <a href="https://twitter.com/NASA/status/1">date</a>'
+        "</blockquote>",
+        "<p>a</div>outside the fragment",
+        "<div><p>unclosed <b>tags &amp; &foo; &#150;",
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 7, 65536])
+def test_html_to_markdown_stream_matches_html_to_markdown(html, chunk_size):
+    chunks = pydevto.html_to_markdown_stream(html, chunk_size=chunk_size)
+    assert "".join(chunks) == pydevto.html_to_markdown(html)
+
+
+def test_html_to_markdown_stream_emits_closed_blocks():
+    fed = []
+
+    def source():
+        for chunk in ["<html><body><p>one</p>", "<p>two", "</p></body></html>"]:
+            fed.append(chunk)
+            yield chunk
+
+    chunks = pydevto.html_to_markdown_stream(source())
+    assert next(chunks) == "one\n\n"
+    assert len(fed) == 1
+    assert list(chunks) == ["two\n\n"]
+
+
+def test_html_to_markdown_stream_file(tmp_path):
+    path = tmp_path / "export.html"
+    path.write_bytes("<p>ünïcode</p>".encode("utf-8"))
+    with open(path, "rb") as f:
+        assert "".join(pydevto.html_to_markdown_stream(f, chunk_size=1)) == "ünïcode\n\n"
+
+
+def test_html_to_markdown_stream_backends(parser):
+    html = '<p>one <a href="https://example.com">link</a></p><ol><li>a</li><li>b</li></ol>'
+    chunks = pydevto.html_to_markdown_stream(html, chunk_size=5, parser=parser)
+    assert "".join(chunks) == pydevto.html_to_markdown(html, parser=parser)
+
+
+def test_html_to_markdown_unknown_tag_named_element(parser):
+    # a tag named like a converter helper must not be dispatched to it
+    html = "<p>a<element>x</element>b</p>"
+    assert pydevto.html_to_markdown(html, parser=parser) == "axb\n\n"
+    assert "".join(pydevto.html_to_markdown_stream(html, parser=parser)) == "axb\n\n"
+
+
+def test_parser_falls_back_to_html_parser(monkeypatch):
+    markdown_converter = pydevto.markdown_converter
+    assert markdown_converter.resolve_parser("auto") == available_parsers()[-1]
+    monkeypatch.setattr(markdown_converter, "available_parsers", lambda: [markdown_converter.HTML_PARSER])
+    assert markdown_converter.MarkdownConverter(parser="lxml-direct").parser == "html.parser"
+    assert markdown_converter.resolve_parser("auto") == "html.parser"
+    with pytest.raises(ValueError):
+        markdown_converter.MarkdownConverter(parser="html5lib")
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_html_to_markdown_many(ordered):
+    htmls = ["<h1>heading</h1>", None, "<b>bold</b>"] + ["<p>%s</p>" % i for i in range(20)]
+    results = list(pydevto.html_to_markdown_many(iter(htmls), workers=2, chunksize=3, ordered=ordered))
+    if ordered:
+        assert [result.index for result in results] == list(range(len(htmls)))
+    results.sort()
+    assert results[0] == (0, "# heading\n\n", None)
+    assert results[1].markdown is None and isinstance(results[1].error, AttributeError)
+    assert [result.markdown for result in results[2:]] == [pydevto.html_to_markdown(html) for html in htmls[2:]]
+
+
+def test_conversion_profile(parser):
+    profile = pydevto.markdown_converter.ConversionProfile()
+    html = "<p>one <b>two</b></p><p>three</p><span>four</span>"
+    markdown = pydevto.html_to_markdown(html, parser=parser, profile=profile)
+    assert markdown == pydevto.html_to_markdown(html, parser=parser)
+    pydevto.html_to_markdown(html, parser=parser, profile=profile)
+
+    report = profile.to_dict()
+    assert report["documents"] == 2
+    assert report["input_size"] == 2 * len(html)
+    assert report["output_size"] == 2 * len(markdown)
+    assert report["text_nodes"] == 8
+    assert {name: tag["calls"] for name, tag in report["tags"].items()} == {"p": 4, "b": 2, "span": 2}
+    assert 0 < report["parse_time"] <= report["total_time"]
+
+    total = pydevto.markdown_converter.ConversionProfile().merge(profile).merge(report)
+    assert total.documents == 4
+    assert total.tags["p"].calls == 8
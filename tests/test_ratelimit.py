@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import pytest
+
+import pydevto
+from pydevto.ratelimit import TokenBucket, retry_after
+from tests.stub_server import StubServer
+
+
+def flaky(*responses):
+    """Route answering with the given responses in turn, then with the last one"""
+    responses = list(responses)
+
+    def route(request):
+        return responses.pop(0) if len(responses) > 1 else responses[0]
+
+    return route
+
+
+@pytest.fixture
+def server():
+    with StubServer() as stub:
+        yield stub
+
+
+def test_retries_429_honouring_retry_after(server):
+    server.route("POST", "/articles", flaky((429, {"Retry-After": "0.1"}, {}), {"id": 1}))
+    api = pydevto.PyDevTo(base_url=server.url)
+    start = time.monotonic()
+    assert api.create_article("title") == {"id": 1}
+    assert time.monotonic() - start >= 0.1
+    assert len(server.requests) == 2
+
+
+def test_retries_5xx_only_for_idempotent_methods(server):
+    server.route("GET", "/tags", flaky((503, {}, {}), (502, {}, b"bad gateway"), [{"name": "python"}]))
+    server.route("POST", "/webhooks", flaky((503, {}, {"error": "unavailable"}), {"id": 1}))
+    api = pydevto.PyDevTo(base_url=server.url, backoff_factor=0.01)
+    assert api.tags() == [{"name": "python"}]
+    with pytest.raises(pydevto.PyDevToError) as error:
+        api.create_webhook("DEV", "https://example.com", [])
+    assert error.value.status_code == 503
+    assert error.value.body == {"error": "unavailable"}
+    assert len(server.requests) == 4
+
+
+def test_gives_up_after_max_retries(server):
+    server.route("GET", "/webhooks", lambda r: (500, {}, b"oops"))
+    api = pydevto.PyDevTo(base_url=server.url, max_retries=2, backoff_factor=0.01)
+    with pytest.raises(pydevto.PyDevToError) as error:
+        api.webhooks()
+    assert error.value.body == "oops"
+    assert len(server.requests) == 3
+
+
+def test_rate_limiter_separates_reads_and_writes(server):
+    server.route("GET", "/tags", lambda r: [])
+    server.route("POST", "/articles", lambda r: {"id": 1})
+    limiter = pydevto.RateLimiter(read_rate=1000, read_burst=5, write_rate=20, write_burst=1)
+    api = pydevto.PyDevTo(base_url=server.url, rate_limiter=limiter)
+    start = time.monotonic()
+    for _ in range(20):
+        api.tags()
+    assert time.monotonic() - start < 0.2
+    start = time.monotonic()
+    for _ in range(3):
+        api.create_article("title")
+    assert time.monotonic() - start >= 0.09
+
+
+def test_token_bucket_pause():
+    bucket = TokenBucket(rate=1000, burst=10)
+    bucket.pause(0.05)
+    assert 0.04 < bucket.reserve() <= 0.05
+
+
+def test_retry_after_parsing():
+    assert retry_after({"Retry-After": "3"}) == 3
+    assert retry_after({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0
+    assert retry_after({}) is None
+
+
+def test_async_retries_and_errors(server):
+    pytest.importorskip("aiohttp")
+    server.route("GET", "/tags", flaky((429, {"Retry-After": "0"}, {}), [{"name": "python"}]))
+
+    async def run():
+        async with pydevto.AsyncPyDevTo(base_url=server.url) as api:
+            tags = await api.tags()
+            with pytest.raises(pydevto.PyDevToError) as error:
+                await api.webhook(1)
+            return tags, error.value.status_code
+
+    assert asyncio.run(run()) == ([{"name": "python"}], 404)
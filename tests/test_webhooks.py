@@ -0,0 +1,126 @@
+import asyncio
+import json
+
+from pydevto.webhooks import WebhookReceiver
+
+
+def event(article_id, type="article_created"):
+    return json.dumps({"data": {"type": type, "attributes": {"id": article_id}}}).encode()
+
+
+async def post(port, body, headers=None, path="/"):
+    """POST body on a new connection, return (status, headers, json body)"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = ["POST %s HTTP/1.1" % path, "Host: localhost", "Content-Length: %s" % len(body), "Connection: close"]
+    head.extend("%s: %s" % item for item in (headers or {}).items())
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+    response = await reader.read()
+    writer.close()
+    head, _, data = response.partition(b"\r\n\r\n")
+    lines = head.decode().split("\r\n")
+    response_headers = dict(line.split(": ", 1) for line in lines[1:])
+    return int(lines[0].split(" ")[1]), response_headers, json.loads(data)
+
+
+def test_webhook_receiver_batches_and_dedupes():
+    batches = []
+
+    async def run():
+        async with WebhookReceiver(batches.append, port=0, batch_size=3, batch_timeout=0.05) as receiver:
+            statuses = []
+            for article_id in range(7):
+                statuses.append((await post(receiver.port, event(article_id), {"X-Event-Id": article_id}))[0])
+            # redelivery of an accepted event, by id and by identical body
+            statuses.append((await post(receiver.port, event(99), {"X-Event-Id": 3}))[0])
+            statuses.append((await post(receiver.port, event(100)))[0])
+            statuses.append((await post(receiver.port, event(100)))[0])
+            statuses.append((await post(receiver.port, b"not json"))[0])
+            statuses.append((await post(receiver.port, b'{"data": {}}'))[0])
+            statuses.append((await post(receiver.port, event(1), path="/other"))[0])
+            await asyncio.sleep(0.2)
+            return statuses, receiver.stats()
+
+    statuses, stats = asyncio.run(run())
+    assert statuses == [202] * 7 + [200, 202, 200, 400, 400, 404]
+    events = [event for batch in batches for event in batch]
+    assert [event.data["data"]["attributes"]["id"] for event in events] == list(range(7)) + [100]
+    assert [event.id for event in events[:7]] == [str(i) for i in range(7)]
+    assert events[0].type == "article_created"
+    assert all(len(batch) <= 3 for batch in batches)
+    assert stats["accepted"] == 8 and stats["duplicates"] == 2 and stats["invalid"] == 2
+    assert stats["delivered"] == 8 and stats["batches"] == len(batches) and stats["pending"] == 0
+
+
+def test_webhook_receiver_backpressure():
+    delivered = []
+
+    async def run():
+        gate = asyncio.Event()
+
+        async def slow(events):
+            await gate.wait()
+            delivered.extend(events)
+
+        async with WebhookReceiver(
+            slow, port=0, batch_size=1, max_pending=2, enqueue_timeout=0.05, retry_after=7
+        ) as receiver:
+            responses = [await post(receiver.port, event(i)) for i in range(5)]
+            refused = await post(receiver.port, event(3))
+            gate.set()
+            await asyncio.sleep(0.05)
+            retried = await post(receiver.port, event(3))
+            stats = receiver.stats()
+        return responses, refused, retried, stats
+
+    responses, refused, retried, stats = asyncio.run(run())
+    # one batch in the callback, two queued, the rest refused until the callback catches up
+    assert [status for status, _, _ in responses] == [202, 202, 202, 503, 503]
+    assert responses[3][1]["Retry-After"] == "7"
+    assert refused[0] == 503 and retried[0] == 202
+    assert stats["refused"] == 3
+    # close() hands the accepted events to the callback
+    assert len(delivered) == 4
+
+
+def test_webhook_receiver_keep_alive_and_callback_errors():
+    async def failing(events):
+        raise RuntimeError("boom")
+
+    async def run():
+        async with WebhookReceiver(failing, port=0, batch_size=10, batch_timeout=0.01) as receiver:
+            reader, writer = await asyncio.open_connection("127.0.0.1", receiver.port)
+            for article_id in range(3):
+                body = event(article_id)
+                writer.write(b"POST / HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+                await reader.readexactly(length)
+                assert head.startswith(b"HTTP/1.1 202")
+            writer.close()
+            await asyncio.sleep(0.1)
+            return receiver.stats(), receiver.last_error
+
+    stats, error = asyncio.run(run())
+    assert stats["accepted"] == 3 and stats["callback_errors"] >= 1
+    assert isinstance(error, RuntimeError)
+
+
+def test_webhook_receiver_does_not_echo_request_headers():
+    async def request(port, head):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(head.encode() + b"\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+        return response.partition(b"\r\n\r\n")[0].decode().split("\r\n")
+
+    async def run():
+        async with WebhookReceiver(lambda events: None, port=0, max_body_size=10) as receiver:
+            missing = await request(receiver.port, "POST / HTTP/1.1\r\nHost: localhost\r\nX-Secret: token123")
+            too_large = await request(receiver.port, "POST / HTTP/1.1\r\nX-Secret: token123\r\nContent-Length: 11")
+        return missing, too_large
+
+    for lines in asyncio.run(run()):
+        names = [line.split(":", 1)[0].lower() for line in lines[1:]]
+        assert "x-secret" not in names and "host" not in names
+        assert names.count("content-type") == 1
+    assert lines[0].startswith("HTTP/1.1 413")